@@ -1,6 +1,8 @@
 """Color utilities"""
 
+from functools import lru_cache
 import html
+import math
 from typing import Optional
 
 from .color_constants import CSS3_NAMES_TO_HEX
@@ -20,7 +22,19 @@ def mix_hex_color_strings(
 
     Returns:
       RGB tuple of mixed colors
+
+    Note: Writers mix the same few concept colors for many spans, so mixes are cached
     """
+    if color_b is None:
+        assert not isinstance(color_a, str)
+        color_a = tuple(color_a)
+    return _mix_hex_colors(color_a, color_b, t, gamma)
+
+
+@lru_cache(maxsize=1024)
+def _mix_hex_colors(color_a, color_b: Optional[str], t: float, gamma: float) -> tuple:
+    """Mix colors (see :func:`mix_hex_color_strings`), where a list of colors is a tuple"""
+
     # See https://stackoverflow.com/questions/726549/algorithm-for-additive-color-mixing-for-rgb-values
     def hex_to_float(h: str, color_missing: Optional[str] = None):
         """
@@ -39,7 +53,8 @@ def mix_hex_color_strings(
                 print("Warning:", "Unknown color name", h)
                 return color_missing
             h = hex
-        return tuple(int(h[i : i + 2], 16) / 255.0 for i in (1, 3, 5))  # skip '#'
+        rgb = int(h[1:7], 16)  # skip '#'
+        return ((rgb >> 16) / 255.0, ((rgb >> 8) & 0xFF) / 255.0, (rgb & 0xFF) / 255.0)
 
     def float_to_hex(rgb: tuple) -> str:
         """
@@ -53,15 +68,19 @@ def mix_hex_color_strings(
         """
         return f"#{int(rgb[0]*255):02x}{int(rgb[1]*255):02x}{int(rgb[2]*255):02x}"
 
+    if gamma == 2:
+        # Square and square root are exact (correctly rounded), and faster than pow
+        power = lambda x: x * x
+        root = math.sqrt
+    else:
+        power = lambda x: x**gamma
+        root = lambda x: x ** (1 / gamma)
     if color_b is None:
-        assert not isinstance(color_a, str)
         if len(color_a) == 1:
             return color_a[0]
         floats = [hex_to_float(h, (0, 0, 0)) for h in color_a]
-        rgb = [
-            pow(sum((1 / len(floats)) * c[i] ** gamma for c in floats), 1 / gamma)
-            for i in (0, 1, 2)
-        ]
+        weight = 1 / len(floats)
+        rgb = [root(sum(weight * power(c[i]) for c in floats)) for i in (0, 1, 2)]
         # print(color_a, floats, rgb)
     else:
         a = hex_to_float(color_a)
@@ -70,10 +89,7 @@ def mix_hex_color_strings(
         b = hex_to_float(color_b)
         if b is None:
             return color_a
-        rgb = [
-            pow((1 - t) * a[i] ** gamma + t * b[i] ** gamma, 1 / gamma)
-            for i in (0, 1, 2)
-        ]
+        rgb = [root((1 - t) * power(a[i]) + t * power(b[i])) for i in (0, 1, 2)]
     return float_to_hex(rgb)
 
 
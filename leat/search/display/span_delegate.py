@@ -168,15 +168,7 @@ class HTMLInlineSpanDelegate(BaseWriterDelegate):
           match_results: Sequence[MatchResult]: Match results for the doc span
         """
         for mr in match_results:
-            self.writer.write_tag(
-                "span",
-                tag_args={
-                    "style": "color:" + self.writer.get_match_result_color(mr),
-                    "title": mr.astext(),
-                },
-            )
-            self.writer.write_span_label(mr.pattern.concept)
-            self.writer.write_tag("span", close=True)
+            self.writer.write_concept_span(mr)
 
     def continue_doc_span(self, match_results: Sequence["MatchResult"]):
         """
@@ -210,7 +202,7 @@ class HTMLInlineSpanDelegate(BaseWriterDelegate):
             "span",
             tag_args={
                 "style": "background-color:" + color,
-                "title": "; ".join(self.tooltip),
+                "title": html.escape("; ".join(self.tooltip)),
             },
         )
 
@@ -0,0 +1,223 @@
+"""Prefilter match patterns by literal strings that any of their matches must contain"""
+
+import re
+from typing import List, Optional, Set, Tuple
+
+from . import MatchPattern
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants, sre_parse
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+    """True iff pyahocorasick is available to prefilter match patterns"""
+except ModuleNotFoundError:
+    AHOCORASICK_AVAILABLE = False
+
+MAX_LITERALS = 256
+"""Maximum number of literal strings to track for a (sub)pattern"""
+
+MIN_LITERAL_LENGTH = 2
+"""Minimum length of the required literals for a pattern to be prefiltered"""
+
+_FOLD_TRANS = str.maketrans({"ı": "i", "İ": "i"})
+"""Dotless i and dotted capital I, which match i with re.IGNORECASE, but casefold differently"""
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT} | (
+    {sre_constants.POSSESSIVE_REPEAT}
+    if hasattr(sre_constants, "POSSESSIVE_REPEAT")
+    else set()
+)
+"""Regex parser codes for repeats"""
+
+
+def fold_text(text: str) -> str:
+    """
+    Fold case of text, so that characters that match with re.IGNORECASE are the same
+
+    Args:
+      text: str: Text to fold
+
+    Returns:
+      str: Folded text
+
+    Note: Folding is per character, so if a pattern matches a substring of the text, the folded
+          literals of the pattern are in the folded text, whether or not the pattern ignores case
+    """
+    return text.translate(_FOLD_TRANS).casefold()
+
+
+def required_literals(regex: re.Pattern) -> Optional[Set[str]]:
+    """
+    Find literal strings such that any match of the regex contains one of them (case folded)
+
+    Args:
+      regex: re.Pattern: Compiled regex
+
+    Returns:
+      Set[str] | None: Folded literals, or None if none are found of at least :data:`MIN_LITERAL_LENGTH`
+
+    Example::
+
+      required_literals(re.compile(r"\\b(?:precision|recall)\\b")) == {"precision", "recall"}
+    """
+    if not isinstance(regex.pattern, str):
+        return None
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+    exact, required = _sequence_literals(parsed)
+    literals = _better_literals(required, exact)
+    if literals is None:
+        return None
+    literals = {fold_text(s) for s in literals}
+    if min(len(s) for s in literals) < MIN_LITERAL_LENGTH:
+        return None
+    return literals
+
+
+def _better_literals(a: Optional[set], b: Optional[set]) -> Optional[set]:
+    """
+    Return the better of two sets of required literals, i.e., with the longer shortest literal
+
+    A set with the empty string requires nothing, so is no better than None
+    """
+    if b is None or "" in b:
+        return None if a is None or "" in a else a
+    if a is None or "" in a:
+        return b
+    a_min = min(len(s) for s in a)
+    b_min = min(len(s) for s in b)
+    if a_min != b_min:
+        return a if a_min > b_min else b
+    return a if len(a) <= len(b) else b
+
+
+def _sequence_literals(subpattern) -> Tuple[Optional[set], Optional[set]]:
+    """
+    Literals of a parsed sequence of regex items
+
+    Args:
+      subpattern: Parsed (sub)pattern from the regex parser
+
+    Returns:
+      set | None: All strings the sequence can match (exact), or None if unknown or too many
+      set | None: Literals one of which any match contains, or None if unknown
+    """
+    run = {""}  # Exact strings of the current run of exact items
+    whole = True
+    best = None
+    for op, av in subpattern:
+        exact, required = _item_literals(op, av)
+        best = _better_literals(best, required)
+        if exact is not None and len(run) * len(exact) <= MAX_LITERALS:
+            run = {a + b for a in run for b in exact}
+            continue
+        best = _better_literals(best, run)
+        whole = False
+        run = exact if exact is not None else {""}
+    best = _better_literals(best, run)
+    return (run if whole else None), best
+
+
+def _item_literals(op, av) -> Tuple[Optional[set], Optional[set]]:
+    """
+    Literals of a parsed regex item (see :func:`_sequence_literals`)
+
+    Args:
+      op: Regex parser code of the item
+      av: Arguments of the item
+
+    Returns:
+      set | None: Exact strings the item can match
+      set | None: Required literals of the item
+    """
+    if op is sre_constants.LITERAL:
+        return {chr(av)}, None
+    if op is sre_constants.IN:
+        chars = set()
+        for in_op, in_av in av:
+            if in_op is sre_constants.LITERAL:
+                chars.add(chr(in_av))
+            else:
+                return None, None
+        return chars, None
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # Zero width
+        return {""}, None
+    if op is sre_constants.SUBPATTERN:
+        return _sequence_literals(av[-1])
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _sequence_literals(av)
+    if op is sre_constants.BRANCH:
+        branches = [_sequence_literals(branch) for branch in av[1]]
+        exact = set()
+        for branch_exact, _ in branches:
+            if branch_exact is None or exact is None:
+                exact = None
+            else:
+                exact |= branch_exact
+        if exact is not None and len(exact) > MAX_LITERALS:
+            exact = None
+        required = set()
+        for branch_exact, branch_required in branches:
+            literals = _better_literals(branch_required, branch_exact)
+            if literals is None:
+                return exact, None
+            required |= literals
+        return exact, required
+    if op in _REPEATS:
+        min_repeat, max_repeat, item = av
+        exact, required = _sequence_literals(item)
+        if min_repeat == 0:
+            if max_repeat == 1 and exact is not None:
+                return exact | {""}, None
+            return None, None
+        if min_repeat == max_repeat == 1:
+            return exact, required
+        return None, _better_literals(required, exact)
+    return None, None
+
+
+def build_literal_prefilter(
+    match_patterns: List[MatchPattern],
+) -> Tuple[Optional["ahocorasick.Automaton"], List[MatchPattern], List[MatchPattern]]:
+    """
+    Build an Aho-Corasick automaton of the required literals of the match patterns
+
+    Args:
+      match_patterns: List[MatchPattern]: Match patterns to prefilter
+
+    Returns:
+      ahocorasick.Automaton | None: Automaton, whose values are the ids of the patterns requiring each literal (or None if none prefiltered)
+      List[MatchPattern]: Match patterns in the automaton, in id order
+      List[MatchPattern]: Match patterns without required literals (and should always be searched)
+
+    Note: The automaton is searched in text folded with :func:`fold_text`. Only patterns that
+          have no matches are skipped, so the matches are the same as without prefiltering.
+    """
+    if not AHOCORASICK_AVAILABLE:
+        return None, [], list(match_patterns)
+    literal_ids = {}
+    prefiltered = []
+    separate = []
+    for p in match_patterns:
+        literals = required_literals(p.regex)
+        if literals is None:
+            separate.append(p)
+            continue
+        for literal in literals:
+            literal_ids.setdefault(literal, []).append(len(prefiltered))
+        prefiltered.append(p)
+    if not prefiltered:
+        return None, [], separate
+    automaton = ahocorasick.Automaton()
+    for literal, ids in literal_ids.items():
+        automaton.add_word(literal, tuple(ids))
+    automaton.make_automaton()
+    return automaton, prefiltered, separate
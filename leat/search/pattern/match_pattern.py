@@ -15,8 +15,13 @@ class MatchPattern:
       source: str: Source configuration file for the match pattern
       metadata: dict: Dictionary of auxillary information
 
+    Note: Match patterns are hashed by identity (used as dict keys in results), and
+          use slots to keep instances small
+
     """
 
+    __slots__ = ("concept", "pattern", "regex", "flags", "source", "metadata")
+
     def __init__(
         self,
         concept: str,
@@ -1,12 +1,55 @@
 """Build match patterns for search"""
 
 from collections import defaultdict
+import hashlib
+import json
+import os
+from pathlib import Path
+import pickle
 import re
-from typing import Iterable, List, Optional
+import stat
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from ..config import ConfigData
+from ..config.config_data import config_json_format_simplify
 from . import MatchPattern
 
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants, sre_parse
+
+try:
+    import hyperscan
+
+    HYPERSCAN_AVAILABLE = True
+    """True iff hyperscan is available to prefilter match patterns"""
+except ModuleNotFoundError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+    """True iff google-re2 is available as a regex engine"""
+except ModuleNotFoundError:
+    RE2_AVAILABLE = False
+
+try:
+    import regex as regex_engine
+
+    REGEX_AVAILABLE = True
+    """True iff the regex module is available as a regex engine"""
+except ModuleNotFoundError:
+    REGEX_AVAILABLE = False
+
+REGEX_ENGINES = ("re", "re2", "regex")
+"""Regex engines with which match patterns can be searched"""
+
+PATTERN_CACHE_VERSION = 1
+"""Version of the built match patterns in the pattern cache. Increment when building changes."""
+
 
 class PatternBuilder:
     """Builds match patterns from config data"""
@@ -25,13 +68,22 @@ class PatternBuilder:
 
         Returns:
           List[MatchPattern]: List of match patterns
+
+        Note: If the pattern cache is enabled (see :func:`pattern_cache_dir`), the match patterns
+              are loaded from it if they were built before for the same config data
         """
-        match_patterns, spattern = build_config_match_patterns(
-            configdata.data,
-            configdata.config_file,
-            metadata,
-            super_pattern=super_pattern,
-        )
+        cache_file = pattern_cache_file(configdata, metadata, super_pattern)
+        cached = load_cached_patterns(cache_file)
+        if cached is not None:
+            match_patterns, spattern = cached
+        else:
+            match_patterns, spattern = build_config_match_patterns(
+                configdata.data,
+                configdata.config_file,
+                metadata,
+                super_pattern=super_pattern,
+            )
+            save_cached_patterns(cache_file, (match_patterns, spattern))
         if super_pattern:
             # print(spattern)
             return match_patterns, spattern
@@ -39,6 +91,144 @@ class PatternBuilder:
             return match_patterns
 
 
+def pattern_cache_dir() -> Optional[Path]:
+    """
+    Directory of the pattern cache, or None if it is not enabled
+
+    Set environment variable LEAT_PATTERN_CACHE_DIR to the directory to use, or
+    LEAT_PATTERN_CACHE=1 to use ~/.cache/leat/patterns. LEAT_PATTERN_CACHE=0 disables it.
+
+    Note: Cached patterns are unpickled, which can run arbitrary code, so only use a
+          directory that other users cannot write to (see :func:`load_cached_patterns`).
+
+    Returns:
+      Path | None: Directory of the pattern cache
+    """
+    enabled = os.environ.get("LEAT_PATTERN_CACHE", "")
+    if enabled == "0":
+        return None
+    cache_dir = os.environ.get("LEAT_PATTERN_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    if enabled == "1":
+        return Path.home() / ".cache" / "leat" / "patterns"
+    return None
+
+
+def pattern_cache_file(
+    configdata: ConfigData, metadata: dict = {}, super_pattern: bool = False
+) -> Optional[Path]:
+    """
+    File in the pattern cache for the match patterns built from config data
+
+    Args:
+      configdata: ConfigData: Configuration data with the concept terms and patterns to use
+      metadata: dict: Auxillary data to include in match pattern objects (Default value = {})
+      super_pattern: bool: Whether a super pattern is also built (Default value = False)
+
+    Returns:
+      Path | None: Cache file, named by a hash of the arguments, or None if the pattern cache is not enabled
+    """
+    cache_dir = pattern_cache_dir()
+    if cache_dir is None:
+        return None
+    try:
+        source = json.dumps(
+            [
+                PATTERN_CACHE_VERSION,
+                {k: config_json_format_simplify(v) for k, v in configdata.data.items()},
+                str(configdata.config_file),
+                metadata,
+                super_pattern,
+            ],
+            sort_keys=True,
+        )
+    except TypeError:
+        print("WARN:", "Not caching match patterns for config data", configdata)
+        return None
+    return cache_dir / (hashlib.sha256(source.encode()).hexdigest() + ".pkl")
+
+
+def load_cached_patterns(cache_file: Optional[Path]) -> Optional[tuple]:
+    """
+    Load match patterns from the pattern cache
+
+    Args:
+      cache_file: Path | None: Cache file from :func:`pattern_cache_file`
+
+    Returns:
+      tuple | None: Match patterns and super pattern, or None if not cached
+
+    Note: The cache file is unpickled, so must be trusted. Where file ownership is available
+          (POSIX), the file and its directory are only loaded if owned by the current user and
+          not writable by group or others.
+    """
+    if cache_file is None or not cache_file.is_file():
+        return None
+    if not _is_trusted_cache_path(cache_file):
+        return None
+    try:
+        with open(cache_file, "rb") as ifp:
+            return pickle.load(ifp)
+    except Exception as e:
+        print("WARN:", "Unable to load cached match patterns", cache_file, e)
+        return None
+
+
+def _is_trusted_cache_path(cache_file: Path) -> bool:
+    """
+    Whether the cache file and its directory are owned by the current user and not writable by others
+
+    Args:
+      cache_file: Path: Cache file to check
+
+    Returns:
+      bool: True if the cache file can be trusted (or ownership is unavailable, e.g., on Windows)
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    uid = os.getuid()
+    for path in (cache_file.parent, cache_file):
+        try:
+            st = path.stat()
+        except OSError as e:
+            print("WARN:", "Unable to check pattern cache", path, e)
+            return False
+        if st.st_uid != uid or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            print(
+                "WARN:",
+                "Not loading cached match patterns, since not owned by the user or writable by others:",
+                path,
+            )
+            return False
+    return True
+
+
+def save_cached_patterns(cache_file: Optional[Path], cached: tuple):
+    """
+    Save match patterns to the pattern cache, replacing the file atomically
+
+    Args:
+      cache_file: Path | None: Cache file from :func:`pattern_cache_file`. Do not save if None.
+      cached: tuple: Match patterns and super pattern
+    """
+    if cache_file is None:
+        return
+    tmp_file = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_file.parent, suffix=".tmp", delete=False
+        ) as ofp:
+            tmp_file = Path(ofp.name)
+            pickle.dump(cached, ofp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except (OSError, pickle.PicklingError) as e:
+        print("WARN:", "Unable to save cached match patterns", cache_file, e)
+        if tmp_file is not None:
+            tmp_file.unlink(missing_ok=True)
+
+
 def build_config_match_patterns(
     config: ConfigData,
     source_name: str = "",
@@ -58,7 +248,11 @@ def build_config_match_patterns(
 
     Returns:
       List[MatchPattern]: List of match patterns
-      Optional[str]: super pattern (if super_pattern arg is True)
+      Optional[str]: super pattern (if super_pattern arg is True, and all patterns can be included in it)
+
+    Note: The super pattern is meant to be compiled with re.IGNORECASE. Patterns from pattern
+          sheets keep their own flags, scoped to a group, and if one cannot be (e.g., it has
+          groups), no super pattern is built.
 
     Note: Wildcards in terms are glob style (i.e., "*" or "?"), and are converted to regex style
           Matches any "word" char, i.e., alphanumeric or underscore
@@ -94,15 +288,404 @@ def build_config_match_patterns(
             if super_pattern:
                 all_patterns.extend(pats)
     if super_pattern:
+        parts = [_scoped_pattern(p) for p in all_patterns]
+        if None in parts:
+            print("INFO:", "Not building super pattern for patterns with groups")
+            return result, None
         if all_patterns:
-            return result, r"\b" + super_trie.pattern() + r"\b|" + "|".join(
-                all_patterns
-            )
+            return result, r"\b" + super_trie.pattern() + r"\b|" + "|".join(parts)
         else:
             return result, r"\b" + super_trie.pattern() + r"\b"
     return result, None
 
 
+SCOPED_FLAGS = (
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+"""Regex flags that can be set or cleared for a group, with their inline letter"""
+
+
+def _scoped_pattern(match_pattern: MatchPattern) -> Optional[str]:
+    """
+    Wrap a match pattern in a non-capturing group with its flags scoped to the group
+
+    Args:
+      match_pattern: MatchPattern: Match pattern to wrap
+
+    Returns:
+      str | None: The wrapped pattern, or None if it has groups (which would be renumbered
+        when combined) or is not valid inside a group (e.g., global inline flags)
+    """
+    regex = match_pattern.regex
+    if regex.groups:
+        return None
+    on = "".join(c for f, c in SCOPED_FLAGS if regex.flags & f)
+    off = "".join(c for f, c in SCOPED_FLAGS if not regex.flags & f)
+    if regex.flags & re.ASCII:
+        on += "a"
+    part = "(?" + on + ("-" + off if off else "") + ":" + match_pattern.pattern + ")"
+    try:
+        re.compile(part)
+    except re.error:
+        return None
+    return part
+
+
+def build_combined_pattern(
+    match_patterns: List[MatchPattern],
+) -> Tuple[Optional[re.Pattern], List[MatchPattern], List[MatchPattern]]:
+    """
+    Build a single regex that is an alternation of the match patterns, so text can be scanned once
+
+    Args:
+      match_patterns: List[MatchPattern]: Match patterns to combine
+
+    Returns:
+      re.Pattern | None: Combined regex, where group i matches for the i-th combined pattern (or None if none combined)
+      List[MatchPattern]: Match patterns in the combined regex, in group order
+      List[MatchPattern]: Match patterns that could not be combined (and should be searched separately)
+
+    Note: Each match pattern is wrapped in a capturing group with its flags scoped to the
+          group. Patterns with their own groups (which would renumber backreferences) or that
+          are not valid inside a group (e.g., global inline flags) are not combined.
+          An alternation only finds the leftmost match at each position, so where matches of
+          different patterns overlap, only the first pattern's match is found.
+    """
+    combined = []
+    combined_parts = []
+    separate = []
+    for p in match_patterns:
+        part = _scoped_pattern(p)
+        if part is None:
+            separate.append(p)
+            continue
+        combined.append(p)
+        combined_parts.append("(" + part + ")")
+    if not combined:
+        return None, [], separate
+    return re.compile("|".join(combined_parts)), combined, separate
+
+
+UNICODE_ONLY_WHITESPACE = re.compile("[\x1c-\x1f]")
+"""ASCII characters that are whitespace (i.e., match \\s) in str patterns, but not with re.ASCII"""
+
+
+def ascii_regex(regex: re.Pattern) -> re.Pattern:
+    """
+    Compile the regex with re.ASCII, which is faster, and finds the same matches in ASCII text
+
+    Args:
+      regex: re.Pattern: Compiled regex
+
+    Returns:
+      re.Pattern: The regex compiled with re.ASCII, or the regex itself if it cannot be
+
+    Note: The matches are the same only in text that is ASCII and has no :data:`UNICODE_ONLY_WHITESPACE`,
+          and only for patterns that are ASCII, as Unicode classes and case folding then agree
+          with ASCII ones.
+    """
+    if (
+        not isinstance(regex.pattern, str)
+        or regex.flags & re.ASCII
+        or not regex.pattern.isascii()
+    ):
+        return regex
+    try:
+        return re.compile(regex.pattern, (regex.flags & ~re.UNICODE) | re.ASCII)
+    except (re.error, ValueError):
+        # e.g., an inline (?u) flag
+        return regex
+
+
+_HS_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: "0-9",
+    sre_constants.CATEGORY_WORD: "0-9A-Za-z_",
+    sre_constants.CATEGORY_SPACE: "\\t\\n\\x0b\\f\\r\\x1c-\\x20",
+}
+"""ASCII characters of the regex classes (e.g., \\d), as hyperscan class items"""
+
+_HS_NOT_CATEGORIES = {
+    sre_constants.CATEGORY_NOT_DIGIT: sre_constants.CATEGORY_DIGIT,
+    sre_constants.CATEGORY_NOT_WORD: sre_constants.CATEGORY_WORD,
+    sre_constants.CATEGORY_NOT_SPACE: sre_constants.CATEGORY_SPACE,
+}
+"""Negated regex classes, and the class they negate"""
+
+_HS_NON_ASCII = "\\x{80}-\\x{10ffff}"
+"""All non-ASCII characters, as a hyperscan class item"""
+
+_HS_CASE_EXTRAS = {"i": (0x130, 0x131), "k": (0x212A,), "s": (0x17F,)}
+"""Non-ASCII characters that match an ASCII letter with re.IGNORECASE"""
+
+_HS_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT} | (
+    {sre_constants.POSSESSIVE_REPEAT}
+    if hasattr(sre_constants, "POSSESSIVE_REPEAT")
+    else set()
+)
+"""Regex parser codes for repeats"""
+
+
+def hyperscan_expression(regex: re.Pattern) -> Optional[str]:
+    """
+    Translate a regex into a hyperscan expression that matches wherever the regex matches
+
+    Args:
+      regex: re.Pattern: Compiled regex
+
+    Returns:
+      str | None: Expression (compile with :func:`hyperscan_flags`), or None if the regex cannot be translated
+
+    Note: The expression is generated from the parsed regex, so re syntax that hyperscan reads
+          differently (e.g., {,n}) is not passed through. Where the two engines differ, the
+          expression matches more, not less: anchors, word boundaries and lookarounds are
+          dropped, classes (e.g., \\w, \\s) match their ASCII characters and all non-ASCII
+          characters, and . matches newlines. Backreferences, conditionals, scoped flags, and
+          case insensitive non-ASCII characters are not translated.
+    """
+    if not isinstance(regex.pattern, str) or regex.flags & re.LOCALE:
+        return None
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        return _hs_sequence(parsed, regex.flags)
+    except (ValueError, re.error, RecursionError):
+        return None
+
+
+def hyperscan_flags(regex: re.Pattern) -> int:
+    """Hyperscan flags to compile the expression from :func:`hyperscan_expression` for a regex"""
+    flag = (
+        hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_DOTALL
+    )
+    if regex.flags & re.IGNORECASE:
+        flag |= hyperscan.HS_FLAG_CASELESS
+    return flag
+
+
+def _hs_sequence(subpattern, flags: int) -> str:
+    """Hyperscan expression of a parsed sequence of regex items (see :func:`hyperscan_expression`)"""
+    return "".join(_hs_item(op, av, flags) for op, av in subpattern)
+
+
+def _hs_item(op, av, flags: int) -> str:
+    """
+    Hyperscan expression of a parsed regex item (see :func:`hyperscan_expression`)
+
+    Raises:
+      ValueError: If the item cannot be translated
+    """
+    if op is sre_constants.LITERAL:
+        return _hs_literal(av, flags, in_class=False)
+    if op is sre_constants.NOT_LITERAL:
+        return "[^" + _hs_literal(av, flags, in_class=True, negated=True) + "]"
+    if op is sre_constants.ANY:
+        return "."
+    if op is sre_constants.IN:
+        return _hs_class(av, flags)
+    if op is sre_constants.CATEGORY:
+        return _hs_class([(op, av)], flags)
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # Zero width, so dropping it only adds matches
+        return ""
+    if op is sre_constants.SUBPATTERN:
+        _, add_flags, del_flags, item = av
+        if add_flags or del_flags:
+            raise ValueError("Scoped flags")
+        return "(?:" + _hs_sequence(item, flags) + ")"
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return "(?:" + _hs_sequence(av, flags) + ")"
+    if op is sre_constants.BRANCH:
+        return "(?:" + "|".join(_hs_sequence(b, flags) for b in av[1]) + ")"
+    if op in _HS_REPEATS:
+        min_repeat, max_repeat, item = av
+        if max_repeat == sre_constants.MAXREPEAT:
+            bounds = f"{{{min_repeat},}}"
+        else:
+            bounds = f"{{{min_repeat},{max_repeat}}}"
+        return "(?:" + _hs_sequence(item, flags) + ")" + bounds
+    raise ValueError(f"Unsupported regex item: {op}")
+
+
+def _hs_char(code: int) -> str:
+    """Hyperscan expression of a character, escaped unless it is ASCII alphanumeric"""
+    c = chr(code)
+    if c.isascii() and c.isalnum():
+        return c
+    return f"\\x{{{code:x}}}"
+
+
+def _hs_literal(code: int, flags: int, in_class: bool, negated: bool = False) -> str:
+    """
+    Hyperscan expression of a literal character, with the non-ASCII characters it matches ignoring case
+
+    Raises:
+      ValueError: If a case insensitive non-ASCII character
+    """
+    if not flags & re.IGNORECASE:
+        return _hs_char(code)
+    if code >= 0x80:
+        raise ValueError("Case insensitive non-ASCII character")
+    extras = _HS_CASE_EXTRAS.get(chr(code).lower(), ())
+    if negated or flags & re.ASCII or not extras:
+        # A negated class may exclude fewer characters than re
+        return _hs_char(code)
+    chars = _hs_char(code) + "".join(_hs_char(e) for e in extras)
+    return chars if in_class else "[" + chars + "]"
+
+
+def _hs_class(items, flags: int) -> str:
+    """
+    Hyperscan expression of a parsed regex class
+
+    Raises:
+      ValueError: If the class cannot be translated
+    """
+    negated = bool(items) and items[0][0] is sre_constants.NEGATE
+    if negated:
+        items = items[1:]
+    ascii_only = flags & re.ASCII
+    caseless = flags & re.IGNORECASE
+    parts = []
+    alternatives = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            parts.append(_hs_literal(av, flags, in_class=True, negated=negated))
+        elif op is sre_constants.RANGE:
+            low, high = av
+            if caseless and high >= 0x80:
+                raise ValueError("Case insensitive non-ASCII range")
+            parts.append(_hs_char(low) + "-" + _hs_char(high))
+            if caseless and not negated and not ascii_only:
+                for letter, extras in _HS_CASE_EXTRAS.items():
+                    if low <= ord(letter) <= high or low <= ord(letter.upper()) <= high:
+                        parts.extend(_hs_char(e) for e in extras)
+        elif op is sre_constants.CATEGORY and av in _HS_CATEGORIES:
+            parts.append(_HS_CATEGORIES[av])
+            if not negated and not ascii_only:
+                parts.append(_HS_NON_ASCII)
+        elif op is sre_constants.CATEGORY and av in _HS_NOT_CATEGORIES:
+            if negated:
+                raise ValueError("Negated class in negated class")
+            # Characters not in the ASCII class include all the characters re excludes
+            alternatives.append("[^" + _HS_CATEGORIES[_HS_NOT_CATEGORIES[av]] + "]")
+        else:
+            raise ValueError(f"Unsupported regex class item: {op}")
+    if negated:
+        return "[^" + "".join(parts) + "]"
+    if parts:
+        alternatives.insert(0, "[" + "".join(parts) + "]")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def build_hyperscan_prefilter(
+    match_patterns: List[MatchPattern],
+) -> Tuple[Optional["hyperscan.Database"], List[MatchPattern], List[MatchPattern]]:
+    """
+    Build a hyperscan database that finds which match patterns have any match in a text in one pass
+
+    Args:
+      match_patterns: List[MatchPattern]: Match patterns to prefilter
+
+    Returns:
+      hyperscan.Database | None: Database, where id i is for the i-th prefiltered pattern (or None if none prefiltered)
+      List[MatchPattern]: Match patterns in the database, in id order
+      List[MatchPattern]: Match patterns that hyperscan does not support (and should always be searched)
+
+    Note: The database is only used to skip patterns with no match. Hyperscan reports every match end
+          rather than the leftmost non-overlapping matches of re, so matches themselves still come from
+          re. Each pattern is translated with :func:`hyperscan_expression`, which matches wherever the
+          pattern does, so only patterns with no matches are skipped. Expressions hyperscan cannot
+          compile exactly are compiled as a prefilter (a superset of the expression), and patterns that
+          cannot be translated or compiled at all (e.g., patterns that match the empty string) are not
+          prefiltered.
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None, [], list(match_patterns)
+    expressions = []
+    flags = []
+    prefiltered = []
+    separate = []
+    for p in match_patterns:
+        expression = hyperscan_expression(p.regex)
+        if expression is None:
+            separate.append(p)
+            continue
+        expression = expression.encode("utf-8")
+        flag = hyperscan_flags(p.regex)
+        for f in (flag, flag | hyperscan.HS_FLAG_PREFILTER):
+            try:
+                hyperscan.Database().compile(expressions=[expression], flags=[f])
+            except hyperscan.error:
+                continue
+            expressions.append(expression)
+            flags.append(f)
+            prefiltered.append(p)
+            break
+        else:
+            separate.append(p)
+    if not prefiltered:
+        return None, [], separate
+    db = hyperscan.Database()
+    db.compile(expressions=expressions, ids=list(range(len(expressions))), flags=flags)
+    return db, prefiltered, separate
+
+
+def compile_engine_regexes(
+    match_patterns: List[MatchPattern], engine: str = "re"
+) -> Dict[MatchPattern, object]:
+    """
+    Compile match patterns with another regex engine, for those patterns the engine supports
+
+    Args:
+      match_patterns: List[MatchPattern]: Match patterns to compile
+      engine: str: Regex engine, one of :data:`REGEX_ENGINES` (Default value = "re")
+
+    Returns:
+      Dict[MatchPattern, object]: Dict of match pattern and its regex compiled with the engine (empty for re)
+
+    Note: The compiled regexes have the same finditer and match API as re. For "re2", patterns
+          re2 does not support (e.g., backreferences, lookaround, verbose) are not compiled, so
+          are searched with re. Word boundaries and classes (e.g., \\b, \\w) are ASCII only in re2,
+          so matches next to non-ASCII letters may differ from re.
+    """
+    if engine == "re":
+        return {}
+    if engine not in REGEX_ENGINES:
+        print("WARN:", "Unknown regex engine, using re:", engine)
+        return {}
+    if (engine == "re2" and not RE2_AVAILABLE) or (
+        engine == "regex" and not REGEX_AVAILABLE
+    ):
+        print("WARN:", "Regex engine not available, using re:", engine)
+        return {}
+    result = {}
+    if engine == "regex":
+        for p in match_patterns:
+            try:
+                result[p] = regex_engine.compile(p.regex.pattern, p.regex.flags)
+            except regex_engine.error:
+                continue
+        return result
+    options = re2.Options()
+    options.log_errors = False
+    for p in match_patterns:
+        pattern = p.regex.pattern
+        if not isinstance(pattern, str) or p.regex.flags & re.VERBOSE:
+            continue
+        on = "".join(c for f, c in SCOPED_FLAGS if p.regex.flags & f)
+        try:
+            result[p] = re2.compile(("(?" + on + ")" if on else "") + pattern, options)
+        except re2.error:
+            continue
+    return result
+
+
 def build_match_patterns_search(
     config_data: dict,
     source_name: str = "",
@@ -240,13 +823,18 @@ def create_terms_pattern(
     """
     if not terms:
         return
+    if allow_wildcards and not any("*" in t or "?" in t for t in terms):
+        # All terms are literal, so skip checking for wildcards while quoting
+        allow_wildcards = False
     trie = Trie(allow_wildcards=allow_wildcards)
     for term in terms:
         trie.add(term)
-        if super_trie is not None:
-            super_trie.add(term)
     # print(r"\b" + trie.pattern() + r"\b")
-    return r"\b" + trie.pattern() + r"\b"
+    pattern = r"\b" + trie.pattern() + r"\b"
+    if super_trie is not None:
+        # After serializing, so the super trie can reuse the sub-patterns of shared nodes
+        super_trie.merge(trie)
+    return pattern
 
 
 class Trie:
@@ -257,6 +845,9 @@ class Trie:
     Attributes:
       allow_wildcards: bool: Whether to allow wildcard (Default value = False)
       data: dict: The trie
+
+    Note: Sub-patterns are memoized by trie node, and merged tries share nodes, so
+          a super trie built by merging reuses the sub-patterns already serialized
     """
 
     # Derived from https://stackoverflow.com/questions/42742810/
@@ -270,6 +861,7 @@ class Trie:
         """
         self.data = {}
         self.allow_wildcards = allow_wildcards
+        self._memo: Dict[int, tuple] = {}
 
     def add(self, word: str):
         """
@@ -278,12 +870,46 @@ class Trie:
         Args:
           word: A word to add
         """
+        self._memo.clear()
         ref = self.data
         for char in word:
             ref[char] = ref.get(char, {})
             ref = ref[char]
         ref[""] = 1
 
+    def merge(self, other: "Trie"):
+        """
+        Merge the words of another trie into the trie, sharing (not copying) its nodes
+
+        Args:
+          other: Trie: Trie to merge. It should not be changed afterward.
+
+        Note: The other trie should have the same allow_wildcards, or have no wildcards
+        """
+        self.data = self._merge(self.data, other.data)
+        self._memo.update(other._memo)
+
+    def _merge(self, pData: dict, oData: dict) -> dict:
+        """
+        Merge two trie dictionaries without changing either of them
+
+        Args:
+          pData: dict: Trie dictionary
+          oData: dict: Trie dictionary to merge into pData
+
+        Returns:
+          dict: Merged trie dictionary, which may share nodes with both
+        """
+        if not pData:
+            return oData
+        data = dict(pData)
+        for char, sub in oData.items():
+            if char in data and isinstance(sub, dict):
+                data[char] = self._merge(data[char], sub)
+            else:
+                data[char] = sub
+        return data
+
     def dump(self) -> dict:
         """Returns the trie as a dict"""
         return self.data
@@ -306,6 +932,23 @@ class Trie:
         """
         Converts trie dictionary to a regex pattern string
 
+        Args:
+          pData: dict: Trie dictionary
+
+        Returns:
+          str: Regex pattern string
+        """
+        memo = self._memo.get(id(pData))
+        if memo is not None and memo[0] is pData:
+            return memo[1]
+        result = self._pattern_uncached(pData)
+        self._memo[id(pData)] = (pData, result)
+        return result
+
+    def _pattern_uncached(self, pData):
+        """
+        Converts trie dictionary to a regex pattern string (without using memoized sub-patterns)
+
         Args:
           pData: dict: Trie dictionary
 
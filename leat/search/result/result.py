@@ -1,19 +1,38 @@
 """"Results of pattern matches"""
 
 from abc import ABC
+from array import array
 from collections import defaultdict, Counter
 import copy
+from io import IOBase
+import itertools
+import json
 import re
 from typing import Dict, List, Optional, Sequence, Union
 
 from leat.store.core import Document
 from ..pattern import MatchPattern
 
+try:
+    import numba
+    import numpy as np
+
+    NUMBA_AVAILABLE = True
+    """True iff numba is available to compile the window sweep"""
+except ModuleNotFoundError:
+    NUMBA_AVAILABLE = False
+
+SWEEP_JIT_MIN_SPANS = 1000
+"""Minimum number of spans for which to use the compiled window sweep"""
+
+_WS_TRANS = str.maketrans({"\n": " ", "\r": " ", "\f": " ", "\t": " "})
+"""Translation table to replace whitespace control characters with spaces"""
+
 
 class BaseResult(ABC):
     """Base class for pattern match results"""
 
-    pass
+    __slots__ = ()
 
 
 class DocResult(BaseResult):
@@ -23,14 +42,40 @@ class DocResult(BaseResult):
       doc: Document: The document searched
       pat_results: Dict[MatchPattern: Sequence[MatchResult]]: Dictionary of match pattern and the results found that matched
       sect_results: Sequence[DocSectResult] | None: Sections of the document with their results, if created
+      patterns: List[MatchPattern]: Match patterns of the results, indexed by pat_idx
+      starts: array: Start of each match
+      ends: array: End of each match
+      pat_idx: array: Index into patterns for each match
+      matches_raw: list: Match (re.Match or MatchResult) for each match
+
+    Note: Uses slots, like the section and match results. section_sep is only set if given
+          by the caller, and then included in to_dict.
     """
 
+    __slots__ = (
+        "doc",
+        "patterns",
+        "starts",
+        "ends",
+        "pat_idx",
+        "matches_raw",
+        "sect_results",
+        "section_sep",
+        "_by_concept",
+        "_pat_to_idx",
+        "_pat_results",
+        "_pat_indices",
+        "_sect_cache",
+        "_sorted",
+    )
+
     def __init__(
         self,
         doc: Document,
         pat_results: Dict[MatchPattern, Sequence["MatchResult"]],
         section_sep: int = 0,
         section_max: int = 0,
+        super_pattern: Optional[Union[re.Pattern, str]] = None,
     ):
         """
         Create a DocResult object that contains the result of pattern matches in a document
@@ -40,23 +85,123 @@ class DocResult(BaseResult):
           pat_results: Dict[MatchPattern: Sequence[MatchResult]]: Dictionary of match pattern and the results found that matched
           section_sep: int: Length of text without patterns that is sufficient to create a new section or results (Default value = 0)
           section_max: int: Maximum length of a section. Useful if downstream data structures have a max length, e.g., deep learning tensors. Ignore if 0. (Default value = 0)
+          super_pattern: re.Pattern | str | None: Pattern that matches any of the match patterns. If it does not match the document text, the results are not read (Default value = None)
 
         Returns:
            DocResult: A document result object
+
+        Note: The results for a pattern may be an iterator (e.g., from `finditer`), which is
+              only consumed if the super pattern matches
         """
         self.doc = doc
-        clean_results = {
-            p: [
-                r if type(r) == MatchResult else MatchResult(doc, p, r) for r in results
-            ]
-            for p, results in pat_results.items()
+        if super_pattern is not None:
+            if isinstance(super_pattern, str):
+                super_pattern = re.compile(super_pattern, flags=re.I)
+            if super_pattern.search(doc.text) is None:
+                # No matches from super_pattern, so no need to iterate over individual matches
+                pat_results = {}
+        # Match results are stored as parallel arrays (structure of arrays), indexed by
+        # match number, with MatchResult objects only created when they are needed
+        self.patterns: List[MatchPattern] = []
+        self.starts = array("q")
+        self.ends = array("q")
+        self.pat_idx = array("i")
+        self.matches_raw: list = []
+        for indx, (p, results) in enumerate(pat_results.items()):
+            self.patterns.append(p)
+            if not isinstance(results, list):
+                # e.g., an iterator from finditer
+                results = list(results)
+            if not results:
+                continue
+            # Results for a pattern are usually all re.Match or all MatchResult, so
+            # check the type once, and fall back to checking each if they are mixed
+            try:
+                if isinstance(results[0], MatchResult):
+                    starts = array("q", [r.start for r in results])
+                    ends = array("q", [r.end for r in results])
+                else:
+                    starts = array("q", [r.start() for r in results])
+                    ends = array("q", [r.end() for r in results])
+            except TypeError:
+                starts = array("q")
+                ends = array("q")
+                for r in results:
+                    if isinstance(r, MatchResult):
+                        starts.append(r.start)
+                        ends.append(r.end)
+                    else:
+                        starts.append(r.start())
+                        ends.append(r.end())
+            self.starts.extend(starts)
+            self.ends.extend(ends)
+            self.pat_idx.extend(array("i", [indx]) * len(results))
+            self.matches_raw.extend(results)
+        self._by_concept: Dict[str, List[MatchPattern]] = defaultdict(list)
+        for p in self.patterns:
+            self._by_concept[p.concept].append(p)
+        self._pat_to_idx: Dict[MatchPattern, int] = {
+            p: i for i, p in enumerate(self.patterns)
         }
-        self.pat_results = clean_results
+        self._pat_results: Optional[Dict[MatchPattern, List["MatchResult"]]] = None
+        self._pat_indices: Optional[List[List[int]]] = None
         self.sect_results: Optional[Sequence["DocSectResult"]] = None
+        self._sect_cache: Dict[tuple, List["DocSectResult"]] = {}
+        self._sorted: Optional[tuple] = None
         if section_sep or section_max:
             # print('DEBUG: Sectioning results', section_sep, section_max)
             self.section_results(section_sep, section_max)
 
+    @property
+    def pat_results(self) -> Dict[MatchPattern, List["MatchResult"]]:
+        """Dictionary of match pattern and the results found that matched (created on first use)"""
+        if self._pat_results is None:
+            pat_results = {p: [] for p in self.patterns}
+            for i, pindx in enumerate(self.pat_idx):
+                pat_results[self.patterns[pindx]].append(self._match_result(i))
+            self._pat_results = pat_results
+        return self._pat_results
+
+    def _pattern_indices(self) -> List[List[int]]:
+        """Returns the indexes of the matches of each pattern, by pattern index (computed once)"""
+        if self._pat_indices is None:
+            indices = [[] for _ in self.patterns]
+            for i, pindx in enumerate(self.pat_idx):
+                indices[pindx].append(i)
+            self._pat_indices = indices
+        return self._pat_indices
+
+    def _match_result(self, i: int) -> "MatchResult":
+        """
+        Return the match result for the i-th match, creating it if needed
+
+        Args:
+          i: int: Index of the match
+
+        Returns:
+          MatchResult: The match result
+        """
+        r = self.matches_raw[i]
+        if not isinstance(r, MatchResult):
+            r = MatchResult(self.doc, self.patterns[self.pat_idx[i]], r)
+            self.matches_raw[i] = r
+        return r
+
+    def _sorted_spans(self) -> tuple:
+        """
+        Returns (order, starts, ends) of the matches in span order, computed once
+
+        The starts and ends are arrays, so can be passed to the compiled sweep without copying
+        """
+        if self._sorted is None:
+            order = span_order(self.starts, self.ends)
+            self._sorted = (
+                order,
+                array("q", [self.starts[i] for i in order]),
+                array("q", [self.ends[i] for i in order]),
+            )
+        return self._sorted
+
     def section_results(
         self,
         section_sep: int = 125,
@@ -77,20 +222,39 @@ class DocResult(BaseResult):
 
         Returns:
           Optional[List[DocSectResult]]: List of results divided into document section
+
+        Note: Sections are cached by their parameters, so resectioning with parameters
+              used before does not recompute them
         """
         if not resection and self.sect_results is not None:
             return self.sect_results
-        windows = self.__class__.bin_sliding_window(
-            self.pat_results,
-            section_sep,
-            section_max=section_max,
-            sect_start_pad=sect_start_pad,
-            sect_end_pad=sect_end_pad,
+        if not self.matches_raw:
+            self.sect_results = []
+            return self.sect_results
+        key = (section_sep, section_max, sect_start_pad, sect_end_pad)
+        if key in self._sect_cache:
+            self.sect_results = self._sect_cache[key]
+            return self.sect_results
+        order, starts, ends = self._sorted_spans()
+        windows = sweep_windows(
+            starts,
+            ends,
+            maxsep=section_sep,
+            maxlength=section_max,
+            name=self.doc.name,
         )
         self.sect_results = [
-            DocSectResult(self.doc, w, start_pad=sect_start_pad, end_pad=sect_end_pad)
-            for w in windows
+            DocSectResult(
+                self.doc,
+                [self._match_result(i) for i in order[lo:hi]],
+                start_pad=sect_start_pad,
+                end_pad=sect_end_pad,
+                span=(starts[lo], max(ends[lo:hi])),
+            )
+            for lo, hi in windows
         ]
+        self._sect_cache[key] = self.sect_results
+        return self.sect_results
 
     def all_results(
         self, pat: Optional[MatchPattern] = None, concept: str = ""
@@ -106,18 +270,19 @@ class DocResult(BaseResult):
           List[MatchResult]: List of all match results
         """
         if pat:
+            if self._pat_results is None and pat in self._pat_to_idx:
+                # Only create the match results for this pattern
+                pindx = self._pat_to_idx[pat]
+                return [self._match_result(i) for i in self._pattern_indices()[pindx]]
             return self.pat_results[pat]
         elif concept:
-            return sum(
-                [
-                    vlist
-                    for k, vlist in self.pat_results.items()
-                    if k.concept == concept
-                ],
-                [],
+            return list(
+                itertools.chain.from_iterable(
+                    self.pat_results[k] for k in self._by_concept.get(concept, ())
+                )
             )
         else:
-            return sum(self.pat_results.values(), [])
+            return [self._match_result(i) for i in range(len(self.matches_raw))]
 
     @staticmethod
     def bin_sliding_window(
@@ -140,14 +305,19 @@ class DocResult(BaseResult):
         Returns:
           list: List of windows with matches
         """
-        span_start = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        # start: end: match_pattern: [matches]
-        for k, vlist in results.items():
-            for v in vlist:
-                span_start[v.start][v.end][k].append(v)
-        return __class__.bin_sliding_window_span(
-            span_start, maxsep=section_sep, maxlength=section_max
+        items = [v for vlist in results.values() for v in vlist]
+        starts = [v.start for v in items]
+        ends = [v.end for v in items]
+        order = span_order(starts, ends)
+        items = [items[i] for i in order]
+        windows = sweep_windows(
+            [starts[i] for i in order],
+            [ends[i] for i in order],
+            maxsep=section_sep,
+            maxlength=section_max,
+            items=items,
         )
+        return [items[lo:hi] for lo, hi in windows]
 
     @staticmethod
     def bin_sliding_window_span(
@@ -164,51 +334,19 @@ class DocResult(BaseResult):
         Returns:
           List(dict): List of span keyed dict divided into sections
         """
-        last = -1
-        start = 0
-        results = []
-        current = []
+        starts = []
+        ends = []
+        items = []
         for i in sorted(span_keyed_dict):
-            if not current:
-                start = i
-            if last + maxsep < i:
-                if current:
-                    results.append(current)
-                    current = []
-                    start = i
-            maxend = max(span_keyed_dict[i].keys())
-            if maxlength and (maxend - start) > maxlength:
-                mr1 = list(list(list(span_keyed_dict[i].values())[0].values())[0])[0]
-                try:
-                    name = mr1.doc.name
-                except (AttributeError):
-                    name = mr1
-                if current:
-                    results.append(current)
-                    current = []
-                    print(
-                        "DEBUG",
-                        "For %s, splitting span length %s greater than %s at %s"
-                        % (name, maxend - start, maxlength, i),
-                    )
-                else:
-                    print(
-                        "INFO:",
-                        "For %s, span length %s greater than %s at %s"
-                        % (name, maxend - start, maxlength, i),
-                    )
-                    # print(mr1.doc.text[i:maxend])
-                start = i
-            current.extend(
-                v
-                for pat_match in span_keyed_dict[i].values()
-                for k, vlist in pat_match.items()
-                for v in vlist
-            )
-            last = max(last, maxend)
-        if current:
-            results.append(current)
-        return results
+            for end, pat_match in span_keyed_dict[i].items():
+                for vlist in pat_match.values():
+                    starts.extend([i] * len(vlist))
+                    ends.extend([end] * len(vlist))
+                    items.extend(vlist)
+        windows = sweep_windows(
+            starts, ends, maxsep=maxsep, maxlength=maxlength, items=items
+        )
+        return [items[lo:hi] for lo, hi in windows]
 
     @staticmethod
     def line_sweep_spans(match_results: Sequence["MatchResult"]) -> dict:
@@ -221,24 +359,55 @@ class DocResult(BaseResult):
         Returns:
           dict: Format is {index: {'s|e|c': [match_pattern, ...]}} with Start, End, Continue list for each index
 
-        Note: index for end is pythonic, so index after the matched string ends
+        Note: index for end is pythonic, so index after the matched string ends.
+              Continue lists are shared between indexes where they are unchanged,
+              so they should not be modified.
         """
         # sweepd = {index: {'s|e|c': [match_pattern, ...]}}
-        sweepd = defaultdict(lambda: defaultdict(list))
-        for mr in match_results:
-            sweepd[mr.start]["s"].append(mr)
-            sweepd[mr.end]["e"].append(mr)
-        sweepd = dict(sorted(sweepd.items()))
-        current = []
+        starts = array("q", (mr.start for mr in match_results))
+        ends = array("q", (mr.end for mr in match_results))
+        by_start = sorted(range(len(starts)), key=starts.__getitem__)
+        by_end = sorted(range(len(ends)), key=ends.__getitem__)
+        # sorted positions, so each comparison in the walk is a single lookup
+        start_at = array("q", (starts[i] for i in by_start))
+        end_at = array("q", (ends[i] for i in by_end))
+        current = {}
+        current_pop = current.pop
+        snapshot = []
+        dirty = False
         newd = {}
-        for indx, d in sweepd.items():
-            if "e" in d:
-                current = [mr for mr in current if mr not in d["e"]]
+        si = 0
+        ei = 0
+        n = len(starts)
+        while si < n or ei < n:
+            if si < n and (ei >= n or start_at[si] <= end_at[ei]):
+                indx = start_at[si]
+            else:
+                indx = end_at[ei]
+            d = {}
+            if ei < n and end_at[ei] == indx:
+                ended = d["e"] = []
+                while ei < n and end_at[ei] == indx:
+                    i = by_end[ei]
+                    ended.append(match_results[i])
+                    if current_pop(i, None) is not None:
+                        dirty = True
+                    ei += 1
             if current:
-                d["c"] = current.copy()
-            if "s" in d:
-                current.extend(d["s"])
-            newd[indx] = dict(d)
+                if dirty:
+                    snapshot = list(current.values())
+                    dirty = False
+                d["c"] = snapshot
+            if si < n and start_at[si] == indx:
+                started = d["s"] = []
+                while si < n and start_at[si] == indx:
+                    i = by_start[si]
+                    mr = match_results[i]
+                    started.append(mr)
+                    current[i] = mr
+                    si += 1
+                dirty = True
+            newd[indx] = d
         return newd
 
     def summarize_match_result_terms(
@@ -247,6 +416,7 @@ class DocResult(BaseResult):
         counter_value: bool = True,
         counter_value_as_dict: bool = True,
         fold_case: bool = True,
+        sort_by_count: bool = True,
     ) -> dict:
         """
         Summarize a list of match results, returning as a dictionary keyed by match pattern
@@ -256,6 +426,7 @@ class DocResult(BaseResult):
           counter_value: bool: If True, returned dictionary for each pattern should be a Counter (Default value = True)
           counter_value_as_dict: bool: Cast the returned Counter as a python dict (Default value = True)
           fold_case: bool: Fold upper into lower case while matching terms for Counter creation (Default value = True)
+          sort_by_count: bool: If True, order the terms of a returned dict by decreasing count (Default value = True)
 
         Returns:
           dict: Result terms counter, keyed by match pattern (or concept)
@@ -266,6 +437,7 @@ class DocResult(BaseResult):
             counter_value=counter_value,
             counter_value_as_dict=counter_value_as_dict,
             fold_case=fold_case,
+            sort_by_count=sort_by_count,
         )
 
     def astext(
@@ -287,19 +459,22 @@ class DocResult(BaseResult):
         Returns:
           Text of document result (spans of text)
         """
-        if include_labels:
-            rstr = str(self.doc.name)
-            rstr += "\n"
-        else:
-            rstr = ""
-        for sect_result in self.sect_results:
-            rstr += sect_result.astext(
+        parts = [str(self.doc.name), "\n"] if include_labels else []
+        if self.sect_results is None:
+            self.section_results()
+        parts.extend(
+            sect_result.astext(
                 start_pad=start_pad, end_pad=end_pad, include_labels=include_labels
             )
-        return rstr
+            for sect_result in self.sect_results
+        )
+        return "".join(parts)
 
     def to_dict(
-        self, include_text: bool = False, compact_match_result: bool = True
+        self,
+        include_text: bool = False,
+        compact_match_result: bool = True,
+        columnar: bool = False,
     ) -> dict:
         """
         Convert Document Result to a dict (for serialization)
@@ -307,49 +482,144 @@ class DocResult(BaseResult):
         Args:
           include_text: bool: Whether to include document text (Default value = False)
           compact_match_result:bool: Whether to compact the match result to save space, by removing redundancies (Default value = True)
+          columnar: bool: Whether to write the results of each pattern as lists of starts, ends, and match texts, rather than a dict per match. Implies compact_match_result. (Default value = False)
 
         Returns:
           dict: Dictionary representation of object instance
         """
         d = {}
         d["doc"] = self.doc.to_dict(include_text=include_text, use_hash=True)
-        d["pat_results"] = [
-            [
-                k.to_dict(),
+        if columnar:
+            indices = self._pattern_indices()
+            d["pat_results"] = [
+                [p.to_dict(), self._columnar_results(indices[pindx])]
+                for pindx, p in enumerate(self.patterns)
+            ]
+        else:
+            d["pat_results"] = [
                 [
-                    v.to_dict(
-                        include_doc=(not compact_match_result),
-                        include_pattern=(not compact_match_result),
-                    )
-                    for v in vlist
-                ],
+                    k.to_dict(),
+                    [
+                        v.to_dict(
+                            include_doc=(not compact_match_result),
+                            include_pattern=(not compact_match_result),
+                        )
+                        for v in vlist
+                    ],
+                ]
+                for k, vlist in self.pat_results.items()
             ]
-            for k, vlist in self.pat_results.items()
-        ]
         if hasattr(self, "section_sep"):
             d["section_sep"] = self.section_sep
         return d
 
+    def to_json_stream(
+        self,
+        fp: IOBase,
+        include_text: bool = False,
+        compact_match_result: bool = True,
+        columnar: bool = False,
+    ):
+        """
+        Write Document Result as json to a stream, a match result at a time
+
+        Args:
+          fp: IOBase: Text stream to write the json
+          include_text: bool: Whether to include document text (Default value = False)
+          compact_match_result:bool: Whether to compact the match result to save space, by removing redundancies (Default value = True)
+          columnar: bool: Whether to write the results of each pattern as lists of starts, ends, and match texts (Default value = False)
+
+        Note: Writes the same json as `json.dump(self.to_dict(...), fp)`, without building
+              a dict for every match result first
+        """
+        fp.write('{"doc": ')
+        json.dump(self.doc.to_dict(include_text=include_text, use_hash=True), fp)
+        fp.write(', "pat_results": [')
+        indices = self._pattern_indices()
+        for pindx, p in enumerate(self.patterns):
+            if pindx:
+                fp.write(", ")
+            fp.write("[")
+            json.dump(p.to_dict(), fp)
+            fp.write(", ")
+            if columnar:
+                json.dump(self._columnar_results(indices[pindx]), fp)
+            else:
+                fp.write("[")
+                for k, i in enumerate(indices[pindx]):
+                    if k:
+                        fp.write(", ")
+                    json.dump(
+                        self._match_result(i).to_dict(
+                            include_doc=(not compact_match_result),
+                            include_pattern=(not compact_match_result),
+                        ),
+                        fp,
+                    )
+                fp.write("]")
+            fp.write("]")
+        fp.write("]")
+        if hasattr(self, "section_sep"):
+            fp.write(', "section_sep": ')
+            json.dump(self.section_sep, fp)
+        fp.write("}")
+
+    def _columnar_results(self, indices: List[int]) -> dict:
+        """
+        Returns the starts, ends, and match texts of the matches for a pattern
+
+        Args:
+          indices: List[int]: Indexes of the matches of the pattern (see :meth:`_pattern_indices`)
+
+        Returns:
+          dict: Lists of starts, ends, and match_texts
+        """
+        match_texts = []
+        for i in indices:
+            r = self.matches_raw[i]
+            match_texts.append(
+                r.match_text if isinstance(r, MatchResult) else r.group(0)
+            )
+        return {
+            "starts": [self.starts[i] for i in indices],
+            "ends": [self.ends[i] for i in indices],
+            "match_texts": match_texts,
+        }
+
     @classmethod
-    def from_dict(cls, d: dict):
+    def from_dict(cls, d: dict, patterns: Optional[Dict[str, MatchPattern]] = None):
         """
         Create a DocResult from a dict
 
         Args:
-          d: dict: Dictionary of object
+          d: dict: Dictionary of object, with results of each pattern as a list of dicts, or columnar
+          patterns: Optional[Dict[str, MatchPattern]]: Match patterns already created, keyed by their json, to which the patterns created are added. Pass the same dict when loading several results to share their patterns. (Default value = None)
 
         Returns:
           DocResult: Created from the dictionary
         """
+        if patterns is None:
+            patterns = {}
         doc = Document.from_dict(d["doc"])
         pat_results_dict = d.get("pat_results", {})
         pat_results = {}
         for p_r in pat_results_dict:
-            pat_obj = MatchPattern.from_dict(p_r[0])
-            pat_results[pat_obj] = [
-                MatchResult.from_dict(r, default_doc=doc, default_pattern=pat_obj)
-                for r in p_r[1]
-            ]
+            pat_obj = intern_match_pattern(p_r[0], patterns)
+            if isinstance(p_r[1], dict):
+                results = [
+                    MatchResult.from_span(doc, pat_obj, start, end, match_text)
+                    for start, end, match_text in zip(
+                        p_r[1]["starts"], p_r[1]["ends"], p_r[1]["match_texts"]
+                    )
+                ]
+            else:
+                results = [
+                    MatchResult.from_dict(
+                        r, default_doc=doc, default_pattern=pat_obj, patterns=patterns
+                    )
+                    for r in p_r[1]
+                ]
+            pat_results.setdefault(pat_obj, []).extend(results)
         section_sep = d.get("section_sep", 0)
         return cls(doc, pat_results, section_sep=section_sep)
 
@@ -364,11 +634,9 @@ class DocResult(BaseResult):
           bool: True iff doc result has a match pattern for the concept or match pattern
         """
         if isinstance(concept_or_match_pattern, str):
-            return concept_or_match_pattern in [
-                pat.concept for pat in self.pat_results.keys()
-            ]
+            return concept_or_match_pattern in self._by_concept
         elif isinstance(concept_or_match_pattern, MatchPattern):
-            return concept_or_match_pattern in self.pat_results
+            return concept_or_match_pattern in self._pat_to_idx
         else:
             return False
 
@@ -381,14 +649,19 @@ class DocSectResult(BaseResult):
       results: Dict[MatchPattern: Sequence[MatchResult]]: Dictionary of match pattern and the results found that match
       start_pad: int | None: Number of characters to include prior to match
       end_pad: int | None:  Number of characters to include after the match
+
+    Note: Uses slots, as there can be many sections per document
     """
 
+    __slots__ = ("doc", "results", "start_pad", "end_pad", "_span")
+
     def __init__(
         self,
         doc: Document,
         results: "Sequence[MatchResult]",
         start_pad: Optional[int] = 0,
         end_pad: Optional[int] = 0,
+        span: Optional[tuple] = None,
     ):
         """
         Create a container for the match patterns in a section of a document
@@ -398,11 +671,27 @@ class DocSectResult(BaseResult):
           results: Dict[MatchPattern: Sequence[MatchResult]]: Dictionary of match pattern and the results found that matched
           start_pad: int | None: Number of characters to include prior to match (Default value = 0)
           end_pad: int | None:  Number of characters to include after the match (Default value = 0)
+          span: tuple | None: (first start, last end) of the results, if already known. Computed from results if None (Default value = None)
         """
         self.doc = doc
         self.results = results
         self.start_pad = start_pad
         self.end_pad = end_pad
+        self._span: Optional[tuple] = span
+
+    def _match_span(self) -> tuple:
+        """Returns (first start, last end) of the matches in the section, computed once"""
+        if self._span is None:
+            first_start, last_end = None, None
+            for r in self.results:
+                if first_start is None or r.start < first_start:
+                    first_start = r.start
+                if last_end is None or r.end > last_end:
+                    last_end = r.end
+            if first_start is None:
+                raise ValueError("No match results in section")
+            self._span = (first_start, last_end)
+        return self._span
 
     def start(self, pad: Optional[int] = None) -> int:
         """
@@ -415,7 +704,7 @@ class DocSectResult(BaseResult):
           int: Start position for the section
         """
         pad = pad if pad is not None else self.start_pad
-        return max(0, min(r.start for r in self.results) - pad)
+        return max(0, self._match_span()[0] - pad)
 
     def end(self, pad: Optional[int] = None) -> int:
         """
@@ -428,7 +717,7 @@ class DocSectResult(BaseResult):
           int: End position for the section
         """
         pad = pad if pad is not None else self.end_pad
-        return min(len(self.doc.text), max(r.end for r in self.results) + pad)
+        return min(len(self.doc.text), self._match_span()[1] + pad)
 
     def summarize_match_result_terms(
         self,
@@ -436,6 +725,7 @@ class DocSectResult(BaseResult):
         counter_value: bool = True,
         counter_value_as_dict: bool = True,
         fold_case: bool = True,
+        sort_by_count: bool = True,
     ) -> dict:
         """
         Summarize a list of match results, returning as a dictionary keyed by match pattern
@@ -445,6 +735,7 @@ class DocSectResult(BaseResult):
           counter_value: bool: If True, returned dictionary for each pattern should be a Counter (Default value = True)
           counter_value_as_dict: bool: Cast the returned Counter as a python dict (Default value = True)
           fold_case: bool: Fold upper into lower case while matching terms for Counter creation (Default value = True)
+          sort_by_count: bool: If True, order the terms of a returned dict by decreasing count (Default value = True)
 
         Returns:
           dict: Match results counter, keyed by match pattern (or concept)
@@ -455,6 +746,7 @@ class DocSectResult(BaseResult):
             counter_value=counter_value,
             counter_value_as_dict=counter_value_as_dict,
             fold_case=fold_case,
+            sort_by_count=sort_by_count,
         )
 
     def convert_to_docresult(self, create_copies=True):
@@ -479,6 +771,8 @@ class DocSectResult(BaseResult):
             newmr.end -= start
             newmr.doc = newdoc
             pat_results[newmr.pattern].append(newmr)
+        if not create_copies:
+            self._span = None
         doc_result = DocResult(newdoc, dict(pat_results))
         return doc_result
 
@@ -505,23 +799,15 @@ class DocSectResult(BaseResult):
         end_pad = end_pad if end_pad is not None else self.end_pad
         start = self.start(pad=start_pad)
         end = self.end(pad=end_pad)
-        rstr = (
-            self.doc.text[start:end]
-            .replace("\n", " ")
-            .replace("\r", " ")
-            .replace("\f", " ")
-            .replace("\t", " ")
-        )
-        if not include_labels:
-            rstr += "\n"
-            return rstr
-        for mr in self.results:
-            mrtext = mr.astext(
-                uppercase_match=uppercase_match, include_labels=include_labels
-            )
-            rstr += "\n" + " " * (mr.start - start) + mrtext
-        rstr += "\n"
-        return rstr
+        parts = [self.doc.text[start:end].translate(_WS_TRANS)]
+        if include_labels:
+            for mr in self.results:
+                mrtext = mr.astext(
+                    uppercase_match=uppercase_match, include_labels=include_labels
+                )
+                parts.append("\n" + " " * (mr.start - start) + mrtext)
+        parts.append("\n")
+        return "".join(parts)
 
 
 class MatchResult(BaseResult):
@@ -530,12 +816,21 @@ class MatchResult(BaseResult):
     Attributes:
       doc: Document: The document searched
       pattern: MatchPattern: The pattern found in the search
-      match: re.Match: The match object from the search
+      match: None: Not kept (was the re.Match object from the search)
       start: int: The beginning of the match (from the match object)
       end: int: The end of the match (from the match object)
       match_text: str: The matched text (from the match object)
+
+    Note: Uses slots, as there is one instance per match. The match object is not kept
+          after its span and text are copied, since it holds a reference to the searched text.
     """
 
+    __slots__ = ("doc", "pattern", "match", "start", "end", "match_text")
+
+    # Match results are compared and hashed by identity, so can be kept in sets and dict
+    # keys cheaply. Defining __eq__ would otherwise remove the hash.
+    __hash__ = object.__hash__
+
     def __init__(self, doc: Document, pattern: MatchPattern, match: re.Match):
         """
         The result of a match within a document
@@ -545,7 +840,7 @@ class MatchResult(BaseResult):
           pattern: MatchPattern: The pattern found in the search
           match: re.Match: The match object from the search
         """
-        self.match = match
+        self.match = None
         self.start: int = match.start()
         self.end: int = match.end()
         self.match_text: str = match.group(0)
@@ -597,6 +892,7 @@ class MatchResult(BaseResult):
         d: dict,
         default_pattern: Optional[MatchPattern] = None,
         default_doc: Optional[Document] = None,
+        patterns: Optional[Dict[str, MatchPattern]] = None,
     ) -> "MatchResult":
         """
         Create a MatchResult from a dict
@@ -605,6 +901,7 @@ class MatchResult(BaseResult):
           d: dict: Dictionary of object
           default_pattern: Optional[MatchPattern]: Default MatchPattern to use in object creation if dict value for pattern is None (Default value = None)
           default_doc: Optional[Document]: Default Document to use in object creation if dict value for doc is None (Default value = None)
+          patterns: Optional[Dict[str, MatchPattern]]: Match patterns already created, keyed by their json, to reuse (see :func:`intern_match_pattern`) (Default value = None)
 
         Returns:
           MatchResult: Created from the dictionary
@@ -617,7 +914,9 @@ class MatchResult(BaseResult):
         obj.match_text = d["match_text"]
         pattern = d.get("pattern")
         if pattern is not None:
-            obj.pattern = MatchPattern.from_dict(pattern)
+            obj.pattern = intern_match_pattern(
+                pattern, {} if patterns is None else patterns
+            )
         elif default_pattern is not None:
             obj.pattern = default_pattern
         else:
@@ -631,17 +930,231 @@ class MatchResult(BaseResult):
             obj.doc = None
         return obj
 
+    @classmethod
+    def from_span(
+        cls,
+        doc: Document,
+        pattern: MatchPattern,
+        start: int,
+        end: int,
+        match_text: str,
+    ) -> "MatchResult":
+        """
+        Create a MatchResult from its span, without a match object
+
+        Args:
+          doc: Document: The document searched
+          pattern: MatchPattern: The pattern found in the search
+          start: int: The beginning of the match
+          end: int: The end of the match
+          match_text: str: The matched text
+
+        Returns:
+          MatchResult: Created from the span
+        """
+        obj = cls.__new__(cls)
+        obj.match = None
+        obj.start = start
+        obj.end = end
+        obj.match_text = match_text
+        obj.pattern = pattern
+        obj.doc = doc
+        return obj
+
     def __str__(self):
         """ """
         return f"<{__class__.__name__} {(self.start, self.end)} {self.astext()}>"
 
 
+def intern_match_pattern(d: dict, patterns: Dict[str, MatchPattern]) -> MatchPattern:
+    """
+    Create a MatchPattern from a dict, reusing the one created before for an equal dict
+
+    Args:
+      d: dict: Dict form of the MatchPattern
+      patterns: Dict[str, MatchPattern]: Match patterns already created, keyed by their json serialization, to which the created pattern is added
+
+    Returns:
+      MatchPattern: Shared instance for the dict
+
+    Note: Avoids compiling the same regex again for each match result loaded. Since match
+          patterns are hashed by identity, results loaded with the same patterns dict share
+          the same pattern keys (and metadata), so the dict is scoped by the caller, e.g., to
+          one load, rather than kept for the process.
+    """
+    try:
+        key = json.dumps(d, sort_keys=True)
+    except TypeError:
+        # not json serializable (e.g., metadata objects), so do not intern
+        return MatchPattern.from_dict(d)
+    pattern = patterns.get(key)
+    if pattern is None:
+        pattern = patterns[key] = MatchPattern.from_dict(d)
+    return pattern
+
+
+def span_order(starts: Sequence[int], ends: Sequence[int]) -> List[int]:
+    """
+    Order match indices by start, keeping matches with the same span together (in the order first seen)
+
+    Args:
+      starts: Sequence[int]: Start of each match
+      ends: Sequence[int]: End of each match
+
+    Returns:
+      List[int]: Indices of the matches in span order
+    """
+    # Index at which each match's span was first seen
+    first_seen = {}
+    span_index = [
+        first_seen.setdefault(span, i) for i, span in enumerate(zip(starts, ends))
+    ]
+    # Two stable sorts with C-level keys: group same spans, then order groups by start
+    order = sorted(range(len(span_index)), key=span_index.__getitem__)
+    order.sort(key=starts.__getitem__)
+    return order
+
+
+def _sweep(starts, ends, maxsep: int, maxlength: int, offsets, notes) -> tuple:
+    """
+    Sweep spans (sorted by start) to find the windows separated by maxsep or more.
+    Integer only, so it can be compiled by numba, if available.
+
+    Args:
+      starts: Start of each span, in sorted order
+      ends: End of each span
+      maxsep: int: Length of span-less text sufficient to start a new window
+      maxlength: int: Maximum length of a window. Ignore if 0.
+      offsets: Output buffer (length n + 1) for the index at which each window starts
+      notes: Output buffer (length 3 * n) for (index, length, split) of each overlong window
+
+    Returns:
+      tuple: Number of offsets and number of notes values written
+    """
+    n = len(starts)
+    noffsets = 0
+    nnotes = 0
+    last = -1
+    start = 0
+    lo = 0
+    i = 0
+    while i < n:
+        s = starts[i]
+        maxend = ends[i]
+        j = i + 1
+        while j < n and starts[j] == s:
+            if ends[j] > maxend:
+                maxend = ends[j]
+            j += 1
+        if lo == i:
+            start = s
+        if last + maxsep < s and lo < i:
+            offsets[noffsets] = lo
+            noffsets += 1
+            lo = i
+            start = s
+        if maxlength > 0 and (maxend - start) > maxlength:
+            notes[nnotes] = i
+            notes[nnotes + 1] = maxend - start
+            notes[nnotes + 2] = 1 if lo < i else 0
+            nnotes += 3
+            if lo < i:
+                offsets[noffsets] = lo
+                noffsets += 1
+                lo = i
+            start = s
+        if maxend > last:
+            last = maxend
+        i = j
+    if lo < n:
+        offsets[noffsets] = lo
+        noffsets += 1
+    return noffsets, nnotes
+
+
+if NUMBA_AVAILABLE:
+    _sweep_jit = numba.njit(cache=True)(_sweep)
+
+
+def sweep_windows(
+    starts: Sequence[int],
+    ends: Sequence[int],
+    maxsep: int = 1,
+    maxlength: Optional[int] = None,
+    name: Optional[str] = None,
+    items: Optional[Sequence] = None,
+) -> List[tuple]:
+    """
+    Divide spans (sorted by start) into windows with separation of distance maxsep or more
+
+    Args:
+      starts: Sequence[int]: Start of each span, in sorted order
+      ends: Sequence[int]: End of each span
+      maxsep: int: Length of match-less text sufficient to start a new window (Default value = 1)
+      maxlength: Optional[int]: Maximum length of a window. Ignore if 0 or None. (Default value = None)
+      name: Optional[str]: Name of the document, for messages (Default value = None)
+      items: Optional[Sequence]: Items for the spans, used for messages if name is None (Default value = None)
+
+    Returns:
+      List[tuple]: List of (lo, hi) index bounds of each window
+
+    Note: Uses numba to compile the sweep for large numbers of spans, if it is installed
+    """
+    n = len(starts)
+    maxlength = maxlength or 0
+    if n == 0:
+        return []
+    if n == 1 and not (maxlength and ends[0] - starts[0] > maxlength):
+        return [(0, 1)]
+    if NUMBA_AVAILABLE and n >= SWEEP_JIT_MIN_SPANS:
+        offsets = np.empty(n + 1, dtype=np.int64)
+        notes = np.empty(3 * n, dtype=np.int64)
+        noffsets, nnotes = _sweep_jit(
+            np.asarray(starts, dtype=np.int64),
+            np.asarray(ends, dtype=np.int64),
+            maxsep,
+            maxlength,
+            offsets,
+            notes,
+        )
+        offsets = offsets[:noffsets].tolist()
+        notes = notes[:nnotes].tolist()
+    else:
+        offsets = [0] * (n + 1)
+        notes = [0] * (3 * n)
+        noffsets, nnotes = _sweep(starts, ends, maxsep, maxlength, offsets, notes)
+        del offsets[noffsets:], notes[nnotes:]
+    # Messages for overlong windows
+    for k in range(0, len(notes), 3):
+        i, length, split = notes[k : k + 3]
+        label = name
+        if label is None and items is not None:
+            # Name of the document of the first item in the window
+            doc = getattr(items[i], "doc", None)
+            label = doc.name if doc is not None else items[i]
+        if split:
+            print(
+                "DEBUG",
+                "For %s, splitting span length %s greater than %s at %s"
+                % (label, length, maxlength, starts[i]),
+            )
+        else:
+            print(
+                "INFO:",
+                "For %s, span length %s greater than %s at %s"
+                % (label, length, maxlength, starts[i]),
+            )
+    offsets.append(n)
+    return [(offsets[k], offsets[k + 1]) for k in range(len(offsets) - 1)]
+
+
 def summarize_match_result_terms(
     match_results: Union[list, dict],
     concept_key: bool = False,
     counter_value: bool = True,
     counter_value_as_dict: bool = True,
     fold_case: bool = True,
+    sort_by_count: bool = True,
 ) -> dict:
     """
     Summarize a list of match results, returning as a dictionary keyed by match pattern.
@@ -655,6 +1168,7 @@ def summarize_match_result_terms(
       counter_value: bool: If True, returned dictionary for each pattern should be a Counter (Default value = True)
       counter_value_as_dict: bool: Cast the returned Counter as a python dict (Default value = True)
       fold_case: bool: Fold upper into lower case while matching terms for Counter creation, unless match pattern was case sensitive (Default value = True)
+      sort_by_count: bool: If True, order the terms of a returned dict by decreasing count, otherwise by first match (Default value = True)
 
     Returns:
       dict: Result terms counter, keyed by match pattern (or concept)
@@ -664,66 +1178,67 @@ def summarize_match_result_terms(
     else:
         results = defaultdict(list)
     if isinstance(match_results, dict):
-        for pat, mr_list in match_results.items():
-            for mr in mr_list:
-                # print('DEBUG', 'MR', (mr.pattern.pattern, mr.match_text, mr.start(), mr.end()))
-                if counter_value:
-                    results[pat][mr.match_text] += 1
-                else:
-                    results[pat].append(mr.match_text)
+        pat_texts = (
+            (pat, [mr.match_text for mr in mr_list])
+            for pat, mr_list in match_results.items()
+        )
     else:
+        pat_texts = defaultdict(list)
         for mr in match_results:
-            # print('DEBUG', 'MR', (mr.pattern.pattern, mr.match_text, mr.start(), mr.end()))
-            if counter_value:
-                results[mr.pattern][mr.match.match_text] += 1
-            else:
-                results[mr.pattern].append(mr.match.match_text)
+            pat_texts[mr.pattern].append(mr.match_text)
+        pat_texts = pat_texts.items()
+    for pat, texts in pat_texts:
+        if not texts:
+            continue
+        if counter_value:
+            # Counter.update counts an iterable in C
+            results[pat].update(texts)
+        else:
+            results[pat].extend(texts)
     # Maybe fold case
     if fold_case and counter_value:
         newresults = {}
+        ignorecase = re.IGNORECASE
         for pat, ctr in results.items():
-            if not (pat.flags & re.IGNORECASE):
+            if not (pat.flags & ignorecase):
                 # only fold case if the pattern had ignore case flag set (i.e, was case insensitive)
                 newresults[pat] = ctr
                 continue
-            equivalent_terms = defaultdict(list)
+            # Key term for each folded term, in one pass over the counter
+            folded_keys = {}
+            collisions = False
             for term in ctr:
-                equivalent_terms[term.casefold()].append(term)
-            folded_terms = {}
-            for lower, term_list in equivalent_terms.items():
-                if len(term_list) == 1:
-                    continue
-                key = max(
-                    term_list
-                )  # max takes the highest ord value, so prefer lower case or accented
-                for term in term_list:
-                    if term != key:
-                        folded_terms[term] = key
-            newctr = Counter()
+                folded = term.casefold()
+                key = folded_keys.get(folded)
+                if key is None:
+                    folded_keys[folded] = term
+                else:
+                    collisions = True
+                    # max takes the highest ord value, so prefer lower case or accented
+                    folded_keys[folded] = max(key, term)
+            if not collisions:
+                # no terms differ only by case
+                newresults[pat] = ctr
+                continue
+            # defaultdict(int) adds missing terms in C (Counter.__missing__ is python)
+            merged = defaultdict(int)
             for term, val in ctr.items():
-                newctr[folded_terms.get(term, term)] += val
-            newresults[pat] = newctr
+                merged[folded_keys[term.casefold()]] += val
+            newresults[pat] = Counter(merged)
         results = newresults
     # Return results
     if concept_key:
         # First, merge multiple patterns for same concept
         newresults = {}
         for pat, ctr in results.items():
-            if pat.concept in newresults:
-                newresults[pat.concept].update(ctr)
+            concept = pat.concept
+            if concept in newresults:
+                newresults[concept].update(ctr)
             else:
-                newresults[pat.concept] = ctr
-        if counter_value and counter_value_as_dict:
-            return {
-                concept: dict(ctr.most_common(None))
-                for concept, ctr in newresults.items()
-            }
-        else:
-            return newresults
-    else:
-        if counter_value and counter_value_as_dict:
-            return {
-                pattern: dict(ctr.most_common(None)) for pattern, ctr in results.items()
-            }
-        else:
-            return results
+                newresults[concept] = ctr
+        results = newresults
+    if counter_value and counter_value_as_dict:
+        if sort_by_count:
+            return {key: dict(ctr.most_common(None)) for key, ctr in results.items()}
+        return {key: dict(ctr) for key, ctr in results.items()}
+    return results
@@ -1,13 +1,32 @@
 """Search document stores for files that match configured search patterns"""
 
-from collections import defaultdict
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import hashlib
 from pathlib import Path
-from typing import Optional, Union, List
+import queue
+import stat
+import threading
+from typing import Iterable, Optional, Union, List
 import re
 
 from .config import ConfigData
 from .pattern import PatternBuilder
-from .result import DocResult
+from .pattern.literal_prefilter import (
+    AHOCORASICK_AVAILABLE,
+    build_literal_prefilter,
+    fold_text,
+)
+from .pattern.pattern_builder import (
+    HYPERSCAN_AVAILABLE,
+    UNICODE_ONLY_WHITESPACE,
+    ascii_regex,
+    build_combined_pattern,
+    build_hyperscan_prefilter,
+    compile_engine_regexes,
+)
+from .result import DocResult, MatchResult
 from leat.store.core import Document, DocStore
 from leat.store.filesys import LocalFileSys
 
@@ -21,7 +40,15 @@ class Search:
       predefined_configuration: str | None:  If not None, use predefined configuration for config
       default_section_sep: int | None: Length of text without patterns that is sufficient to create a new section or results
       default_section_max: int: Maximum length of a section. Useful if downstream data structures have a max length, e.g., deep learning tensors. Ignore if 0.
-      sparse_data: bool: Whether spans are sparse in doc store. Used for efficiency considerations.
+      sparse_data: bool: Whether spans are sparse in doc store. Used for efficiency considerations, i.e., whether to prefilter documents even with few patterns.
+      combined_scan: bool: Whether to scan each document once with the match patterns combined, rather than once per pattern.
+      use_hyperscan: bool: Whether to use hyperscan to skip match patterns that have no match in a document.
+      use_ahocorasick: bool: Whether to use Aho-Corasick to skip match patterns whose required literals are not in a document.
+      n_workers: int: Number of worker processes with which to search documents. Search in this process if 0 or 1.
+      split_doc_size: int: Minimum length of a document whose match patterns are split across the worker processes in search_documents. Ignore if 0.
+      prefetch: int: Number of documents to read ahead in a background thread, while searching. Do not read ahead if 0.
+      cache_size: int: Maximum number of document results to cache, to skip searching a document again. Do not cache if 0.
+      engine: str: Regex engine with which to search the match patterns ("re", "re2", or "regex").
 
     Search takes a DocStore and ConfigData and generates DocResult for each document. Combines functionality of:
       - DocStore - Documents to be searched
@@ -49,6 +76,14 @@ class Search:
         default_section_sep: Optional[int] = 125,
         default_section_max: int = 0,
         sparse_data: bool = False,
+        combined_scan: bool = False,
+        use_hyperscan: bool = False,
+        use_ahocorasick: bool = False,
+        n_workers: int = 0,
+        split_doc_size: int = 0,
+        prefetch: int = 0,
+        cache_size: int = 0,
+        engine: str = "re",
     ):
         """
         Searches document stores for configured search patterns
@@ -59,11 +94,42 @@ class Search:
           predefined_configuration: str | None:  If not None, use predefined configuration for config (Default value = None)
           default_section_sep: int | None: Length of text without patterns that is sufficient to create a new section or results (Default value = 125)
           default_section_max: int: Maximum length of a section. Useful if downstream data structures have a max length, e.g., deep learning tensors. Ignore if 0 (Default value = 0)
-          sparse_data: bool: Whether spans are sparse in doc store. Used for efficiency considerations. (Default value = False)
+          sparse_data: bool: Whether spans are sparse in doc store. Used for efficiency considerations, i.e., whether to prefilter documents with a super pattern even with few match patterns (it is used with more than 4 regardless). (Default value = False)
+          combined_scan: bool: Whether to scan each document once with the match patterns combined, rather than once per pattern. Faster for many patterns, but where matches of different patterns overlap, only the first is found. (Default value = False)
+          use_hyperscan: bool: Whether to use hyperscan to find, in one pass, the match patterns (not in the combined scan) that have any match in a document, so only those are searched with re. Requires hyperscan. (Default value = False)
+          use_ahocorasick: bool: Whether to use an Aho-Corasick automaton to find, in one pass, which match patterns (not in the combined scan) have any of their required literals in a document, so only those (and patterns without required literals) are searched. Requires pyahocorasick. (Default value = False)
+          n_workers: int: Number of worker processes with which to search documents in :meth:`search_documents`. Search in this process if 0 or 1. (Default value = 0)
+          split_doc_size: int: Minimum length of a document whose match patterns are split into groups, one per worker process, which each search the whole document, in search_documents (which has a pool of workers). For very large documents. Requires n_workers > 1. Ignore if 0. (Default value = 0)
+          prefetch: int: Number of documents to read ahead from the doc store in a background thread, so reading overlaps with searching in :meth:`search_documents`. Do not read ahead if 0. (Default value = 0)
+          cache_size: int: Maximum number of document results to cache (least recently used are dropped), keyed by document name and text hash, so searching an unchanged document again returns the cached result. Do not cache if 0. (Default value = 0)
+          engine: str: Regex engine with which to search the match patterns (not in the combined scan): "re", "re2" (linear time, requires google-re2), or "regex" (requires regex). Patterns the engine does not support are searched with re. (Default value = "re")
         """
         self.match_patterns: Optional[list] = None
         self.sparse_data = sparse_data
+        self.combined_scan = combined_scan
         self._super_pattern = None
+        self._combined_pattern = None
+        self._combined_patterns: list = []
+        self._combined_sources: list = []
+        self._separate_patterns: Optional[list] = None
+        self.cache_size = cache_size
+        self._doc_cache: OrderedDict = OrderedDict()
+        self.use_hyperscan = use_hyperscan
+        self._hyperscan_db = None
+        self._hyperscan_ids: dict = {}
+        self.use_ahocorasick = use_ahocorasick
+        self._literal_automaton = None
+        self._literal_complete = False
+        self.engine = engine
+        self._ascii_super_pattern = None
+        self._ascii_combined_pattern = None
+        self._finditers: list = []
+        self._ascii_finditers: list = []
+        self._repr: Optional[str] = None
+        if use_hyperscan and not HYPERSCAN_AVAILABLE:
+            print("WARN:", "hyperscan not available, searching all match patterns")
+        if use_ahocorasick and not AHOCORASICK_AVAILABLE:
+            print("WARN:", "pyahocorasick not available, searching all match patterns")
         if predefined_configuration:
             self.config = ConfigData(predefined_configuration=predefined_configuration)
         else:
@@ -71,6 +137,9 @@ class Search:
         self.doc_store = doc_store
         self.default_section_sep = default_section_sep
         self.default_section_max = default_section_max
+        self.n_workers = n_workers
+        self.split_doc_size = split_doc_size
+        self.prefetch = prefetch
 
     @property
     def config(self) -> Optional[ConfigData]:
@@ -85,6 +154,8 @@ class Search:
         Args:
           config: ConfigData | Path | str | None: Configuration data, or path to it (Default value = None)
         """
+        self._doc_cache.clear()
+        self._repr = None
         if config is None:
             self._config = None
             return
@@ -93,16 +164,91 @@ class Search:
         elif isinstance(config, Path) or isinstance(config, str):
             self._config = ConfigData(config)
         assert isinstance(self._config, ConfigData)
-        if self.sparse_data:
-            match_patterns, super_pattern = PatternBuilder.build(
-                self._config, super_pattern=True
-            )
-        else:
-            match_patterns = PatternBuilder.build(self._config)
+        match_patterns, super_pattern = PatternBuilder.build(
+            self._config, super_pattern=True
+        )
         self.match_patterns = match_patterns
-        if self.sparse_data and len(match_patterns) > 4:
+        # A super pattern search rejects documents without matches in one scan, which is
+        # only worth the extra scan of documents with matches if there are several patterns
+        if super_pattern is not None and len(match_patterns) > (
+            1 if self.sparse_data else 4
+        ):
             flag = re.I
             self._super_pattern = re.compile(super_pattern, flags=flag)
+        else:
+            self._super_pattern = None
+        if self.combined_scan:
+            (
+                self._combined_pattern,
+                self._combined_patterns,
+                self._separate_patterns,
+            ) = build_combined_pattern(match_patterns)
+        else:
+            self._combined_pattern = None
+            self._combined_patterns = []
+            self._separate_patterns = match_patterns
+        # Group index of the first combined pattern with the same regex as each combined
+        # pattern, since the alternation only finds matches for the first of them
+        firsts = {}
+        self._combined_sources = [
+            firsts.setdefault((p.regex.pattern, p.regex.flags), i)
+            for i, p in enumerate(self._combined_patterns)
+        ]
+        self._build_pattern_engines()
+
+    def _build_pattern_engines(self):
+        """Build the ASCII regexes, and the prefilters and engine regexes for the separately searched match patterns, if used"""
+        self._ascii_super_pattern = (
+            None if self._super_pattern is None else ascii_regex(self._super_pattern)
+        )
+        self._ascii_combined_pattern = (
+            None
+            if self._combined_pattern is None
+            else ascii_regex(self._combined_pattern)
+        )
+        if self.use_hyperscan:
+            self._hyperscan_db, hyperscan_patterns, _ = build_hyperscan_prefilter(
+                self._separate_patterns
+            )
+            self._hyperscan_ids = {p: i for i, p in enumerate(hyperscan_patterns)}
+        else:
+            self._hyperscan_db = None
+            self._hyperscan_ids = {}
+        if self.use_ahocorasick:
+            self._literal_automaton, literal_patterns, always_patterns = (
+                build_literal_prefilter(self._separate_patterns)
+            )
+        else:
+            self._literal_automaton, literal_patterns, always_patterns = None, [], []
+        literal_ids = {p: i for i, p in enumerate(literal_patterns)}
+        # Whether a text without any required literals has no matches
+        self._literal_complete = (
+            self._literal_automaton is not None
+            and not always_patterns
+            and self._combined_pattern is None
+        )
+        # Each separately searched pattern with the earlier pattern with the same regex (or None),
+        # its hyperscan and literal ids (or -1), and bound finditer, for all texts and for ASCII
+        # texts, so searching a text does no lookups per pattern
+        engine_regexes = compile_engine_regexes(self._separate_patterns, self.engine)
+        self._finditers = []
+        self._ascii_finditers = []
+        firsts = {}
+        for p in self._separate_patterns:
+            source = firsts.setdefault((p.regex.pattern, p.regex.flags), p)
+            if source is not p:
+                # e.g., concepts with the same terms, which are searched once
+                self._finditers.append((p, source, -1, -1, None))
+                self._ascii_finditers.append((p, source, -1, -1, None))
+                continue
+            ids = (self._hyperscan_ids.get(p, -1), literal_ids.get(p, -1))
+            regex = engine_regexes.get(p)
+            if regex is None:
+                self._finditers.append((p, None, *ids, p.regex.finditer))
+                regex = ascii_regex(p.regex)
+            else:
+                self._finditers.append((p, None, *ids, regex.finditer))
+            self._ascii_finditers.append((p, None, *ids, regex.finditer))
 
     @property
     def doc_store(self) -> Optional[DocStore]:
@@ -117,6 +263,7 @@ class Search:
         Args:
           doc_store: DocStore | Path | list | str | None: Document store, path(s) to it, or a file to be searched
         """
+        self._repr = None
         if doc_store is None:
             self._doc_store = DocStore()
             return
@@ -126,10 +273,16 @@ class Search:
             self._doc_store = DocStore(LocalFileSys(doc_store))
         elif isinstance(doc_store, str):
             filepath = Path(doc_store)
-            if filepath.is_dir():
+            # One stat call for the path, and another only if it has a ~ to expand
+            mode = _stat_mode(filepath)
+            if stat.S_ISDIR(mode):
                 print("INFO:", "Creating doc store in search for directory:", doc_store)
                 self._doc_store = DocStore(LocalFileSys(filepath))
-            elif filepath.expanduser().is_file():
+            elif stat.S_ISREG(
+                mode
+                if filepath.expanduser() == filepath
+                else _stat_mode(filepath.expanduser())
+            ):
                 lfs = LocalFileSys()
                 lfs.add_directory(
                     filepath.parent, include=filepath.name, recursive=False
@@ -166,14 +319,206 @@ class Search:
         elif self.config is None:
             print("WARN:", "No search patterns configured")
             yield from []
+        elif self.n_workers > 1:
+            yield from self._search_documents_parallel(section_sep, section_max)
         else:
-            for doc in self.doc_store:
+            docs = self.doc_store
+            if self.prefetch > 0:
+                docs = _prefetch(docs, self.prefetch)
+            for doc in docs:
                 result = self.search_document(
                     doc, section_sep=section_sep, section_max=section_max
                 )
                 if result is not None:
                     yield result
 
+    def _search_documents_parallel(
+        self, section_sep: Optional[int], section_max: Optional[int]
+    ):
+        """
+        Search all documents from document store in worker processes
+
+        Args:
+          section_sep: int | None: Length of text without patterns that is sufficient to create a new section or results
+          section_max: int | None: Maximum length of a section. Ignore if 0 or None.
+
+        Yields:
+          DocResult: Result for each document that has one or more matches, in doc store order
+
+        Note: Workers return the match spans for each pattern index, and the results are created
+              here, so they use this search's match patterns (not copies from the workers).
+              At most a few documents per worker are pending at a time.
+        """
+        max_pending = 4 * self.n_workers
+        with self._worker_executor() as executor:
+            pending = deque()
+            for doc in self.doc_store:
+                if not self._is_searchable(doc):
+                    continue
+                key = self._cache_key(doc, section_sep, section_max)
+                if key is not None and key in self._doc_cache:
+                    self._doc_cache.move_to_end(key)
+                    pending.append((doc, key, None, self._doc_cache[key]))
+                elif self._is_split_doc(doc):
+                    pending.append(
+                        (doc, key, self._submit_split(doc.text, executor), None)
+                    )
+                else:
+                    future = executor.submit(_search_worker, doc.text)
+                    pending.append((doc, key, ({}, [future]), None))
+                while len(pending) >= max_pending or (
+                    pending
+                    and (
+                        pending[0][2] is None or all(f.done() for f in pending[0][2][1])
+                    )
+                ):
+                    result = self._pending_doc_result(
+                        *pending.popleft(), section_sep, section_max
+                    )
+                    if result is not None:
+                        yield result
+            while pending:
+                result = self._pending_doc_result(
+                    *pending.popleft(), section_sep, section_max
+                )
+                if result is not None:
+                    yield result
+
+    def _worker_executor(self) -> ProcessPoolExecutor:
+        """Create a pool of n_workers worker processes, each initialized with a copy of this search"""
+        # The doc store (which may not pickle), prefilters and finditers (which
+        # are rebuilt in the workers), and cache stay here
+        worker_search = copy.copy(self)
+        worker_search._doc_store = None
+        worker_search._hyperscan_db = None
+        worker_search._hyperscan_ids = {}
+        worker_search._literal_automaton = None
+        worker_search._finditers = []
+        worker_search._ascii_finditers = []
+        worker_search._doc_cache = OrderedDict()
+        return ProcessPoolExecutor(
+            self.n_workers,
+            initializer=_init_search_worker,
+            initargs=(worker_search,),
+        )
+
+    def _pending_doc_result(
+        self,
+        doc: Document,
+        key: Optional[tuple],
+        submitted: Optional[tuple],
+        cached: Optional[DocResult],
+        section_sep: Optional[int],
+        section_max: Optional[int],
+    ) -> Optional[DocResult]:
+        """
+        Get the result for a document submitted to workers, or from the cache
+
+        Args:
+          doc: Document: Document searched
+          key: tuple | None: Cache key for the document
+          submitted: tuple | None: Matches found here and futures for the worker searches (see :meth:`_submit_split`), or None if the result is cached
+          cached: DocResult | None: Cached result for the document (if submitted is None)
+          section_sep: int | None: Length of text without patterns that is sufficient to create a new section or results
+          section_max: int | None: Maximum length of a section. Ignore if 0 or None.
+
+        Returns:
+          DocResult | None: Result for the document, or None if no matches
+        """
+        if submitted is None:
+            return cached
+        docresults = self._worker_matches(doc, *submitted)
+        result = None
+        if docresults:
+            result = DocResult(
+                doc, docresults, section_sep=section_sep, section_max=section_max
+            )
+        self._cache_result(key, result)
+        return result
+
+    def _is_split_doc(self, doc: Document) -> bool:
+        """Whether the match patterns for a document are split across the worker processes"""
+        return 0 < self.split_doc_size <= len(doc.text) and self.n_workers > 1
+
+    def _submit_split(self, text: str, executor: ProcessPoolExecutor) -> tuple:
+        """
+        Submit the search of a text to the workers, each with a group of the match patterns
+
+        Args:
+          text: str: Text to search
+          executor: ProcessPoolExecutor: Pool of workers from :meth:`_worker_executor`
+
+        Returns:
+          dict: Matches found here, i.e., of the combined scan
+          list: Futures for the worker searches, which are empty if the text has no matches
+        """
+        prescan = self._prescan(text)
+        if prescan is None:
+            return {}, []
+        docresults, finditers, literal_hits = prescan
+        if not finditers:
+            # All patterns are in the combined scan, so nothing to search in the workers
+            return docresults, []
+        ascii_text = finditers is self._ascii_finditers
+        step = -(-len(finditers) // self.n_workers)
+        futures = [
+            executor.submit(
+                _search_worker_group,
+                text,
+                start,
+                start + step,
+                ascii_text,
+                literal_hits,
+            )
+            for start in range(0, len(finditers), step)
+        ]
+        return docresults, futures
+
+    def _worker_matches(self, doc: Document, docresults: dict, futures: list) -> dict:
+        """
+        Add the matches found by the workers to the matches for a document
+
+        Args:
+          doc: Document: Document searched
+          docresults: dict: Matches found here
+          futures: list: Futures for the worker searches, each of which returns a list of (pattern index, list of (start, end)) for the patterns with matches
+
+        Returns:
+          dict: Dict of match pattern and list of its matches, in the same order as :meth:`_find_matches`
+
+        Note: Workers return the match spans, and the results are created here, so they use this
+              search's match patterns (not copies from the workers).
+        """
+        text = doc.text
+        for future in futures:
+            for pindx, spans in future.result():
+                pattern = self.match_patterns[pindx]
+                docresults[pattern] = [
+                    MatchResult.from_span(doc, pattern, start, end, text[start:end])
+                    for start, end in spans
+                ]
+        if len(futures) > 1:
+            # Put the separately searched patterns in order, including those with the same
+            # regex as a pattern in another group
+            for pattern, source, *_ in self._finditers:
+                if source is None:
+                    if pattern in docresults:
+                        docresults[pattern] = docresults.pop(pattern)
+                elif source in docresults:
+                    # Source is earlier, so already in order
+                    matches = docresults.pop(pattern, None)
+                    if matches is None:
+                        # Searched in another group, so results for this pattern are
+                        # created from the spans of the source's results
+                        matches = [
+                            MatchResult.from_span(
+                                doc, pattern, mr.start, mr.end, mr.match_text
+                            )
+                            for mr in docresults[source]
+                        ]
+                    docresults[pattern] = matches
+        return docresults
+
     def search_document(
         self,
         doc: Document,
@@ -192,33 +537,214 @@ class Search:
           DocResult | None: Result for each document, or None if no matches
         """
         # print("INFO:", doc.name, len(doc.text))
-        if not doc:
+        if not self._is_searchable(doc):
             return
+        if section_sep is None:
+            section_sep = self.default_section_sep
+        if section_max is None:
+            section_max = self.default_section_max
+        key = self._cache_key(doc, section_sep, section_max)
+        if key is not None and key in self._doc_cache:
+            self._doc_cache.move_to_end(key)
+            return self._doc_cache[key]
+        docresults = self._find_matches(doc.text)
+        result = None
+        if docresults:
+            result = DocResult(
+                doc, docresults, section_sep=section_sep, section_max=section_max
+            )
+        self._cache_result(key, result)
+        return result
+
+    def _cache_key(
+        self, doc: Document, section_sep: Optional[int], section_max: Optional[int]
+    ) -> Optional[tuple]:
+        """
+        Key for the cached result of a document, or None if results are not cached
+
+        Args:
+          doc: Document: Document searched (its sha256 is set if needed)
+          section_sep: int | None: Length of text without patterns that is sufficient to create a new section or results
+          section_max: int | None: Maximum length of a section
+
+        Returns:
+          tuple | None: Key of document name, text hash, and sectioning
+        """
+        if not self.cache_size:
+            return None
+        if doc.sha256 is None:
+            doc.sha256 = hashlib.sha256(doc.text.encode())
+        sha256 = doc.sha256 if isinstance(doc.sha256, str) else doc.sha256.hexdigest()
+        return (doc.name, sha256, section_sep, section_max)
+
+    def _cache_result(self, key: Optional[tuple], result: Optional[DocResult]):
+        """
+        Cache the result of a document (including None, for no matches), dropping the least recently used
+
+        Args:
+          key: tuple | None: Key from :meth:`_cache_key`. Do not cache if None.
+          result: DocResult | None: Result for the document
+        """
+        if key is None:
+            return
+        self._doc_cache[key] = result
+        if len(self._doc_cache) > self.cache_size:
+            self._doc_cache.popitem(last=False)
+
+    def _is_searchable(self, doc: Document) -> bool:
+        """
+        Check whether a document has text to search, noting why if not
+
+        Args:
+          doc: Document: Document to search
+
+        Returns:
+          bool: True iff the document has text
+        """
+        if not doc:
+            return False
         if not doc.text:
             if doc.sha256:
                 print("WARNING:", "Text no longer available for doc", doc.name)
             else:
                 print("INFO:", "Skipping empty doc", doc.name)
-            return
-        if (
-            self._super_pattern is not None
-            and self._super_pattern.search(doc.text) is None
-        ):
+            return False
+        return True
+
+    def _find_matches(self, text: str) -> dict:
+        """
+        Find the matches of all match patterns in a text
+
+        Args:
+          text: str: Text to search
+
+        Returns:
+          dict: Dict of match pattern and list of its matches (re.Match), for patterns with matches
+        """
+        prescan = self._prescan(text)
+        if prescan is None:
+            return {}
+        return self._scan_matches(text, *prescan)
+
+    def _prescan(self, text: str) -> Optional[tuple]:
+        """
+        Prefilter a text, and find the matches of the combined scan
+
+        Args:
+          text: str: Text to search
+
+        Returns:
+          tuple | None: None if the text has no matches. Otherwise:
+            dict: Dict of match pattern and list of its matches from the combined scan
+            list: Finditers for the separately searched patterns to use for the text
+            set | None: Ids of Aho-Corasick prefiltered patterns to search (see :meth:`_literal_hits`)
+        """
+        if text.isascii() and UNICODE_ONLY_WHITESPACE.search(text) is None:
+            # The re.ASCII versions of the regexes find the same matches, faster
+            super_pattern = self._ascii_super_pattern
+            combined_pattern = self._ascii_combined_pattern
+            finditers = self._ascii_finditers
+        else:
+            super_pattern = self._super_pattern
+            combined_pattern = self._combined_pattern
+            finditers = self._finditers
+        literal_hits = self._literal_hits(text)
+        if self._literal_complete and len(literal_hits) == 1:
+            # No required literals of any pattern, so no need for the super pattern either
+            return None
+        if super_pattern is not None and super_pattern.search(text) is None:
             # If no matches from super_pattern, then no need to iterate over individual matches
-            return
-        if section_sep is None:
-            section_sep = self.default_section_sep
-        if section_max is None:
-            section_max = self.default_section_max
-        docresults = defaultdict(list)
-        for pattern in self.match_patterns:
-            matches = list(pattern.finditer(doc.text))
+            return None
+        docresults = {}
+        if combined_pattern is not None:
+            # One scan for the combined patterns, where group i is for the i-th pattern
+            patterns = self._combined_patterns
+            combined_matches = [[] for _ in patterns]
+            for m in combined_pattern.finditer(text):
+                combined_matches[m.lastindex - 1].append(m)
+            for pattern, source in zip(patterns, self._combined_sources):
+                # Same matches as an earlier pattern (the list is shared, not copied)
+                matches = combined_matches[source]
+                if matches:
+                    docresults[pattern] = matches
+        return docresults, finditers, literal_hits
+
+    def _scan_matches(
+        self,
+        text: str,
+        docresults: dict,
+        finditers: list,
+        literal_hits: Optional[set],
+    ) -> dict:
+        """
+        Find the matches of separately searched match patterns in a text
+
+        Args:
+          text: str: Text to search
+          docresults: dict: Dict of match pattern and list of its matches, to which matches are added
+          finditers: list: Finditers for the patterns to search (see :meth:`_build_pattern_engines`)
+          literal_hits: set | None: Ids of Aho-Corasick prefiltered patterns to search, or None to search all
+
+        Returns:
+          dict: The docresults, with matches added for patterns with matches
+        """
+        hits = self._hyperscan_hits(text)
+        for pattern, source, hyperscan_id, literal_id, finditer in finditers:
+            if source is not None:
+                # Same matches as an earlier pattern (the list is shared, not copied)
+                if source in docresults:
+                    docresults[pattern] = docresults[source]
+                continue
+            if hits is not None and hyperscan_id not in hits:
+                continue
+            if literal_hits is not None and literal_id not in literal_hits:
+                continue
+            # The list of matches is kept as is (not copied into the results)
+            matches = list(finditer(text))
             if matches:
-                docresults[pattern].extend(matches)
-        if docresults:
-            return DocResult(
-                doc, dict(docresults), section_sep=section_sep, section_max=section_max
-            )
+                docresults[pattern] = matches
+        return docresults
+
+    def _hyperscan_hits(self, text: str) -> Optional[set]:
+        """
+        Find ids of the hyperscan prefiltered match patterns that have any match in the text
+
+        Args:
+          text: str: Text to scan
+
+        Returns:
+          set | None: Ids of the prefiltered patterns with a match (-1 is always included, for patterns not prefiltered), or None if all patterns should be searched
+        """
+        if self._hyperscan_db is None:
+            return None
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:
+            # Hyperscan requires valid UTF-8 (e.g., no lone surrogates)
+            return None
+        hits = {-1}
+        self._hyperscan_db.scan(
+            data,
+            match_event_handler=lambda id, start, end, flags, context: hits.add(id),
+        )
+        return hits
+
+    def _literal_hits(self, text: str) -> Optional[set]:
+        """
+        Find ids of the Aho-Corasick prefiltered match patterns with any of their required literals in the text
+
+        Args:
+          text: str: Text to scan
+
+        Returns:
+          set | None: Ids of the prefiltered patterns with a required literal (-1 is always included, for patterns not prefiltered), or None if all patterns should be searched
+        """
+        if self._literal_automaton is None:
+            return None
+        hits = {-1}
+        for _, ids in self._literal_automaton.iter(fold_text(text)):
+            hits.update(ids)
+        return hits
 
     def read_search_document(
         self, file: Union[Path, str], section_sep: Optional[int] = None
@@ -262,15 +788,150 @@ class Search:
 
     def __str__(self):
         """String representation of the object instance"""
-        try:
-            datadirs = [str(p.path) for p in self.doc_store.filesys.datadirs]
-        except AttributeError:
-            datadirs = []
-        try:
-            return f'<{__class__.__name__} {self.config.short_name}({len(self.match_patterns)}) {",".join(datadirs)[:30]}>'
-        except AttributeError:
-            return f'<{__class__.__name__} None(0) {",".join(datadirs)[:30]}>'
+        if self._repr is None:
+            # Built once after the config or doc store is set
+            try:
+                datadirs = [str(p.path) for p in self.doc_store.filesys.datadirs]
+            except AttributeError:
+                datadirs = []
+            try:
+                self._repr = f'<{__class__.__name__} {self.config.short_name}({len(self.match_patterns)}) {",".join(datadirs)[:30]}>'
+            except AttributeError:
+                self._repr = f'<{__class__.__name__} None(0) {",".join(datadirs)[:30]}>'
+        return self._repr
 
     def all_concepts(self) -> List[str]:
         """Returns list of all concepts to be searched"""
         return list(set(mp.concept for mp in self.match_patterns))
+
+
+def _stat_mode(path: Path) -> int:
+    """
+    File mode of a path, following symlinks
+
+    Args:
+      path: Path: Path
+
+    Returns:
+      int: Mode from stat, or 0 if the path does not exist (or cannot be read)
+    """
+    try:
+        return path.stat().st_mode
+    except (OSError, ValueError):
+        return 0
+
+
+_worker_search: Optional[Search] = None
+"""Search used by a worker process, set by :func:`_init_search_worker`"""
+
+_worker_pattern_index: dict = {}
+"""Index of each match pattern of the worker search"""
+
+
+def _init_search_worker(search: Search):
+    """
+    Initialize a worker process with the search to use
+
+    Args:
+      search: Search: Search with match patterns (without doc store)
+    """
+    global _worker_search, _worker_pattern_index
+    _worker_search = search
+    _worker_pattern_index = {p: i for i, p in enumerate(search.match_patterns)}
+    search._build_pattern_engines()
+
+
+def _search_worker(text: str) -> list:
+    """
+    Search a text in a worker process
+
+    Args:
+      text: str: Text to search
+
+    Returns:
+      list: List of (pattern index, list of (start, end)) for the patterns with matches
+    """
+    return [
+        (_worker_pattern_index[p], [m.span() for m in matches])
+        for p, matches in _worker_search._find_matches(text).items()
+    ]
+
+
+def _search_worker_group(
+    text: str, start: int, stop: int, ascii_text: bool, literal_hits: Optional[set]
+) -> list:
+    """
+    Search a text with a group of the separately searched match patterns in a worker process
+
+    Args:
+      text: str: Text to search
+      start: int: Index of the first finditer of the group
+      stop: int: Index after the last finditer of the group
+      ascii_text: bool: Whether to use the finditers for ASCII texts
+      literal_hits: set | None: Ids of Aho-Corasick prefiltered patterns to search, or None to search all
+
+    Returns:
+      list: List of (pattern index, list of (start, end)) for the patterns with matches
+    """
+    finditers = (
+        _worker_search._ascii_finditers if ascii_text else _worker_search._finditers
+    )
+    matches = _worker_search._scan_matches(
+        text, {}, finditers[start:stop], literal_hits
+    )
+    return [
+        (_worker_pattern_index[p], [m.span() for m in pattern_matches])
+        for p, pattern_matches in matches.items()
+    ]
+
+
+def _prefetch(items: Iterable, size: int = 2):
+    """
+    Iterate over items, which are read ahead in a background thread
+
+    Args:
+      items: Iterable: Items to iterate over, e.g., documents from a doc store
+      size: int: Maximum number of items read ahead (Default value = 2)
+
+    Yields:
+      Each item, in order. An exception raised reading the items is raised here.
+
+    Note: Useful if reading the items is I/O bound, as the thread reads while the GIL is released.
+          The thread stops when the iteration is closed.
+    """
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry):
+        """Put an entry in the buffer, unless stopped. Returns True iff put."""
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read():
+        """Read the items into the buffer"""
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+
+    thread = threading.Thread(target=read, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
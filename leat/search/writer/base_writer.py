@@ -1,17 +1,55 @@
 """Base Writer to write document results"""
 
 from abc import ABC
-from io import IOBase
+from contextlib import contextmanager
+from io import BufferedIOBase, IOBase, RawIOBase
 from pathlib import Path
 from typing import Union, Optional
 
+CLEAN_TEXT_TRANS = str.maketrans({"\n": " ", "\r": " ", "\f": " ", "\t": " "})
+"""Translation table to replace whitespace control characters with spaces in written text"""
+
 
 class BaseWriter(ABC):
     """Base Reader to write document results"""
 
+    _buffer: Optional[list] = None
+    """Text written while buffered, or None if writing directly to the stream"""
+
     def __init__(self, stream: IOBase):
         raise NotImplementedError()
 
+    @contextmanager
+    def buffered(self):
+        """
+        Collect the text written in the context, and write it to the stream at once at the end
+
+        Note: Many small writes to a file are slower than one large write. If already buffered,
+              the text is written at the end of the outer context.
+        """
+        if self._buffer is not None:
+            yield
+            return
+        self._buffer = []
+        try:
+            yield
+        finally:
+            text = "".join(self._buffer)
+            self._buffer = None
+            self.write_stream(text)
+
+    def write_stream(self, text: str):
+        """
+        Write text to the instance's stream, encoded as UTF-8 if it is a binary stream
+
+        Args:
+          text: str: Text to write
+        """
+        if isinstance(self.stream, (RawIOBase, BufferedIOBase)):
+            self.stream.write(text.encode("utf-8"))
+        else:
+            self.stream.write(text)
+
     def write(self, text: str):
         "Write document result"
         raise NotImplementedError()
@@ -20,6 +58,8 @@ class BaseWriter(ABC):
 class SpanScheme:
     """Scheme for spans"""
 
+    __slots__ = ("start_pad", "end_pad", "data")
+
     def __init__(
         self, start_pad: Optional[int] = None, end_pad: Optional[int] = None, **kwargs
     ):
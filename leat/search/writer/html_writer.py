@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Optional, Union
 
 from . import BaseWriter, SpanScheme
+from .base_writer import CLEAN_TEXT_TRANS
 from ..result import DocResult, DocSectResult, MatchResult
 from ..display import HTMLInlineSpanDelegate
 
@@ -24,7 +25,7 @@ class HTMLWriter(BaseWriter):
     """Writer to write document results as html
 
     Attributes:
-      stream: Optional[IOBase]: Stream to write html, write string if None (Default value = None)
+      stream: Optional[IOBase]: Stream to write html (as UTF-8 if binary), write string if None (Default value = None)
       scheme: SpanScheme: Scheme to use in generating spans (Default value = None)
       start_pad: int | None: Number of characters to include before a match (Default value = None)
       end_pad: int | None: Number of characters to include after a match (Default value = None)
@@ -50,7 +51,7 @@ class HTMLWriter(BaseWriter):
         Create a writer to write html to a stream
 
         Args:
-          stream: Optional[IOBase]: Stream to write html, write string if None (Default value = None)
+          stream: Optional[IOBase]: Stream to write html (as UTF-8 if binary), write string if None (Default value = None)
           scheme: SpanScheme | dict: Scheme to use in generating spans (Default value = None)
           start_pad: int | None: Number of characters to include before a match (Default value = None)
           end_pad: int | None: Number of characters to include after a match (Default value = None)
@@ -72,11 +73,14 @@ class HTMLWriter(BaseWriter):
         self.end_pad = end_pad if start_pad is not None else self.scheme.end_pad
         self.concept_colors: dict = self.scheme.get("concept_colors", {})
         self.default_span_color: str = DEFAULT_SPAN_COLOR
+        self._concept_span_html: dict = {}
         self.writer_options = {
             **DEFAULT_WRITER_OPTIONS,
             **self.scheme.get("writer_options", {}),
         }
         self.include_doc_name = self.scheme.get("include_doc_name", True)
+        # Checked for every text slice written
+        self._pretty_html = bool(self.writer_options["pretty_html"])
         self.delegate = HTMLInlineSpanDelegate(self)
 
     def write_doc_result(self, item: DocResult):
@@ -98,27 +102,56 @@ class HTMLWriter(BaseWriter):
         Args:
           item: DocSectResult: Document section result to write (via delegate)
         """
+        with self.buffered():
+            self._write_doc_section_result(item)
+
+    def _write_doc_section_result(self, item: DocSectResult):
+        """Write document section result (see :meth:`write_doc_section_result`)"""
         start = item.start(pad=self.start_pad)
         end = item.end(pad=self.end_pad)
         # Sweep spans
         sweepd = DocResult.line_sweep_spans(item.results)
-        self.delegate.start_section(item.results)
+        delegate = self.delegate
+        delegate.start_section(item.results)
+        text = item.doc.text
+        # Cleaning whitespace keeps the length, so the section is cleaned once, and if it has
+        # nothing to escape, its slices are written as they are
+        section_text = text[start:end]
+        if self._pretty_html:
+            section_text = section_text.translate(CLEAN_TEXT_TRANS)
+        if "&" in section_text or "<" in section_text or ">" in section_text:
+            write_clean_text = self.write_clean_text
+            write_text = lambda i, j: write_clean_text(text[i:j])
+        else:
+            write = self.write
+            write_text = lambda i, j: write(section_text[i - start : j - start])
+        # Bound methods, as the loop runs once per span boundary
+        write_span_end = delegate.write_span_end
+        end_doc_span = delegate.end_doc_span
+        init_span = delegate.init_span
+        continue_doc_span = delegate.continue_doc_span
+        start_doc_span = delegate.start_doc_span
+        write_span_start = delegate.write_span_start
         current_index = start
         # span_stack = []
         for indx, d in sweepd.items():
-            self.write_clean_text(item.doc.text[current_index:indx])
-            self.delegate.write_span_end()
-            if "e" in d:
-                self.delegate.end_doc_span(d["e"])
-            self.delegate.init_span()
-            if "c" in d:
-                self.delegate.continue_doc_span(d["c"])
-            if "s" in d:
-                self.delegate.start_doc_span(d["s"])
-            self.delegate.write_span_start()
+            write_text(current_index, indx)
+            write_span_end()
+            # One lookup for each list, which is missing (None) if empty
+            ended = d.get("e")
+            if ended is not None:
+                end_doc_span(ended)
+            init_span()
+            continued = d.get("c")
+            if continued is not None:
+                continue_doc_span(continued)
+            started = d.get("s")
+            if started is not None:
+                start_doc_span(started)
+            write_span_start()
             current_index = indx
-        self.write_clean_text(item.doc.text[current_index:end])
-        self.delegate.end_section()
+        write_text(current_index, end)
+        delegate.end_section()
 
     def get_match_result_color(self, match_result: MatchResult) -> str:
         """
@@ -141,7 +174,35 @@ class HTMLWriter(BaseWriter):
         Args:
           text: str: Span label
         """
-        self.write(f"<sup>[{html.escape(text)}]</sup>")
+        self.write(self.span_label_html(text))
+
+    def span_label_html(self, text: str) -> str:
+        """
+        Returns the html of a span label
+
+        Args:
+          text: str: Text of label
+        """
+        return f"<sup>[{html.escape(text)}]</sup>"
+
+    def write_concept_span(self, match_result: MatchResult):
+        """
+        Write a span labeled with the concept of a match result, in the concept color
+
+        Args:
+          match_result: MatchResult: Match result to write the span for
+
+        Note: The html before and after the title is built once per color and concept
+        """
+        color = self.get_match_result_color(match_result)
+        concept = match_result.pattern.concept
+        span_html = self._concept_span_html.get((color, concept))
+        if span_html is None:
+            span_html = self._concept_span_html[(color, concept)] = (
+                f'<span style="color:{color}" title="',
+                f'">{self.span_label_html(concept)}</span>',
+            )
+        self.write(span_html[0] + html.escape(match_result.astext()) + span_html[1])
 
     def write_clean_text(self, text: str):
         """
@@ -150,14 +211,15 @@ class HTMLWriter(BaseWriter):
         Args:
           text: str: Text to write
         """
-        if self.writer_options["pretty_html"]:
-            text = (
-                text.replace("\n", " ")
-                .replace("\r", " ")
-                .replace("\f", " ")
-                .replace("\t", " ")
-            )
-        self.write(html.escape(text))
+        # Most text has nothing to clean or escape, which substring checks find fastest
+        if self._pretty_html and (
+            "\n" in text or "\r" in text or "\f" in text or "\t" in text
+        ):
+            text = text.translate(CLEAN_TEXT_TRANS)
+        if "&" in text or "<" in text or ">" in text:
+            # Text between tags, so quotes need not be escaped
+            text = html.escape(text, quote=False)
+        self.write(text)
 
     def write_tag(
         self,
@@ -178,19 +240,14 @@ class HTMLWriter(BaseWriter):
           newline: bool: Whether to add a newline at the end (Default value = False)
         """
         "Write html tag"
-        arg_string = (
-            " " + " ".join(k + "=" + f'"{v}"' for k, v in tag_args.items())
-            if tag_args
-            else ""
-        )
-        self.stream.write(
-            "<"
-            + ("/" if close else "")
-            + name
-            + arg_string
-            + ("/" if singleton else "")
-            + ">"
-            + ("\n" if newline else "")
+        end = ">\n" if newline else ">"
+        if not tag_args and not singleton:
+            # Most tags, such as the spans for matches
+            self.write(("</" if close else "<") + name + end)
+            return
+        arg_string = "".join(f' {k}="{v}"' for k, v in tag_args.items())
+        self.write(
+            f"{'</' if close else '<'}{name}{arg_string}{'/' if singleton else ''}{end}"
         )
 
     def write_line(self, text: Optional[str] = None):
@@ -200,9 +257,7 @@ class HTMLWriter(BaseWriter):
         Args:
           text: Optional[str]: Text to write (Default value = None)
         """
-        if text is not None:
-            self.stream.write(text)
-        self.stream.write("\n")
+        self.write("\n" if text is None else text + "\n")
 
     def write(self, text: str):
         """
@@ -211,12 +266,15 @@ class HTMLWriter(BaseWriter):
         Args:
           text: str: Text to write
         """
-        self.stream.write(text)
+        if self._buffer is not None:
+            self._buffer.append(text)
+        else:
+            self.write_stream(text)
 
     def get_doc_result_html(self, doc_result: DocResult) -> str:
         """
         Returns the html string for a single doc result at a time.
-        This reuses a StringIO stream, but resets it before each use, and returns its str value
+        The html is collected in a list and joined, without writing to the stream
 
         Args:
           doc_result: DocResult: Document result to write as html
@@ -224,8 +282,9 @@ class HTMLWriter(BaseWriter):
         Returns:
           str: HTML string of the formatted document result
         """
-        assert isinstance(self.stream, StringIO)
-        self.stream.seek(0)
-        self.stream.truncate(0)
-        self.write_doc_result(doc_result)
-        return self.stream.getvalue()
+        self._buffer = []
+        try:
+            self.write_doc_result(doc_result)
+            return "".join(self._buffer)
+        finally:
+            self._buffer = None
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Optional, Union
 
 from . import BaseWriter, SpanScheme
+from .base_writer import CLEAN_TEXT_TRANS
 from ..result import DocResult, DocSectResult, MatchResult
 
 
@@ -12,7 +13,7 @@ class TextWriter(BaseWriter):
     """Base Reader to write document results as text
 
     Attributes:
-      stream: Optional[IOBase]: Stream to write text, write string if None
+      stream: Optional[IOBase]: Stream to write text (as UTF-8 if binary), write string if None
       scheme: SpanScheme: Scheme to use in generating spans
       start_pad: int | None: Number of characters to include before a match
       end_pad: int | None: Number of characters to include after a match
@@ -35,7 +36,7 @@ class TextWriter(BaseWriter):
         Create a text writer to write text to a stream
 
         Args:
-           stream: Optional[IOBase]: Stream to write text, write string if None (Default value = None)
+           stream: Optional[IOBase]: Stream to write text (as UTF-8 if binary), write string if None (Default value = None)
           scheme: SpanScheme | dict: Scheme to use in generating spans (Default value = None)
           start_pad: int | None: Number of characters to include before a match (Default value = None)
           end_pad: int | None: Number of characters to include after a match (Default value = None)
@@ -64,10 +65,10 @@ class TextWriter(BaseWriter):
         Args:
           item: DocResult: Document result to write (via delegate)
         """
-        self.write(str(item.doc.name))
-        self.write_line()
-        for sect_result in item.sect_results:
-            self.write_doc_section_result(sect_result)
+        with self.buffered():
+            self.write(str(item.doc.name) + "\n")
+            for sect_result in item.sect_results:
+                self.write_doc_section_result(sect_result)
 
     def write_doc_section_result(self, item: DocSectResult):
         """
@@ -78,11 +79,13 @@ class TextWriter(BaseWriter):
         """
         start = item.start(pad=self.start_pad)
         end = item.end(pad=self.end_pad)
-        self.write_clean_text(item.doc.text[start:end])
-        self.write_line()
-        for mr in item.results:
-            mrtext = mr.astext(uppercase_match=self.uppercase_match)
-            self.write_line(" " * (mr.start - start) + mrtext)
+        write = self.write
+        with self.buffered():
+            self.write_clean_text(item.doc.text[start:end])
+            write("\n")
+            for mr in item.results:
+                mrtext = mr.astext(uppercase_match=self.uppercase_match)
+                write(" " * (mr.start - start) + mrtext + "\n")
 
     def write_clean_text(self, text: str):
         """
@@ -91,12 +94,8 @@ class TextWriter(BaseWriter):
         Args:
           text: str: Text to write
         """
-        text = (
-            text.replace("\n", " ")
-            .replace("\r", " ")
-            .replace("\f", " ")
-            .replace("\t", " ")
-        )
+        if "\n" in text or "\r" in text or "\f" in text or "\t" in text:
+            text = text.translate(CLEAN_TEXT_TRANS)
         self.write(text)
 
     def write_line(self, text: Optional[str] = None):
@@ -106,9 +105,7 @@ class TextWriter(BaseWriter):
         Args:
           text: Optional[str]: Text to write (Default value = None)
         """
-        if text is not None:
-            self.stream.write(text)
-        self.stream.write("\n")
+        self.write("\n" if text is None else text + "\n")
 
     def write(self, text: str):
         """
@@ -117,4 +114,7 @@ class TextWriter(BaseWriter):
         Args:
           text: str: Text to write
         """
-        self.stream.write(text)
+        if self._buffer is not None:
+            self._buffer.append(text)
+        else:
+            self.write_stream(text)
@@ -1,3 +1,4 @@
+import io
 import re
 from pathlib import Path
 
@@ -73,3 +74,31 @@ def test_html_writer_exact():
     w.write_doc_result(results)
     html = w.stream.getvalue()
     assert comparison_doc == html
+
+
+def test_html_writer_get_doc_result_html():
+    results = load_results()
+    results.doc.name = results.doc.name.stem
+    with open(RESULT_1, "r") as ifp:
+        comparison_doc = ifp.read()
+    w = HTMLWriter(start_pad=10, end_pad=15, scheme=COLOR_SCHEME)
+    assert w.get_doc_result_html(results) == comparison_doc
+    assert w.get_doc_result_html(results) == comparison_doc
+    assert w.stream.getvalue() == ""
+
+
+def test_html_writer_binary_stream():
+    results = load_results()
+    results.doc.name = results.doc.name.stem
+    with open(RESULT_1, "r") as ifp:
+        comparison_doc = ifp.read()
+    stream = io.BytesIO()
+    w = HTMLWriter(stream, start_pad=10, end_pad=15, scheme=COLOR_SCHEME)
+    w.write_doc_result(results)
+    assert stream.getvalue().decode("utf-8") == comparison_doc
+
+
+def test_html_writer_escape():
+    w = HTMLWriter()
+    w.write_clean_text("a \"quoted\" <tag> & 'more'")
+    assert w.stream.getvalue() == "a \"quoted\" &lt;tag&gt; &amp; 'more'"
@@ -8,7 +8,6 @@ from leat.search.config import ConfigData
 from leat.search import Search
 from leat.search.result import DocResult
 
-
 TEST_DATA_DIRECTORY = Path(__file__).parent.parent / "data" / "docset1"
 
 MATCH_RESULT_TERM_RESULTS = {
@@ -76,7 +75,7 @@ def test_search():
     doc_result = results.pop()
     assert doc_result.doc.name == get_doc().name
     all_matches = doc_result.all_results()
-    all_matched_tokens = [m.match.group(0) for m in all_matches]
+    all_matched_tokens = [m.match_text for m in all_matches]
     for keyword in ["2022", "precision", "recall", "sensitivity", "specificity"]:
         assert keyword in all_matched_tokens
     concept_matches = doc_result.all_results(concept="Data Ethics")
@@ -95,6 +94,51 @@ def test_search():
     )
 
 
+def test_search_n_workers():
+    config_data = ConfigData(predefined_configuration="BasicSearch")
+    searcher = Search(config_data, get_doc_store())
+    expected = [
+        [(m.pattern, m.start, m.end, m.match_text) for m in r.all_results()]
+        for r in searcher.search_documents()
+    ]
+    searcher.n_workers = 2
+    results = list(searcher.search_documents())
+    assert [
+        [(m.pattern, m.start, m.end, m.match_text) for m in r.all_results()]
+        for r in results
+    ] == expected
+    assert results[0].sect_results
+
+
+def test_search_split_doc_size():
+    config_data = ConfigData(predefined_configuration="BasicSearch")
+    searcher = Search(config_data, get_doc_store())
+    expected = [
+        [
+            (p.concept, [(m.pattern.concept, m.start, m.end) for m in ms])
+            for p, ms in r.pat_results.items()
+        ]
+        for r in searcher.search_documents()
+    ]
+    searcher.n_workers = 2
+    searcher.split_doc_size = 1
+    results = list(searcher.search_documents())
+    assert [
+        [
+            (p.concept, [(m.pattern.concept, m.start, m.end) for m in ms])
+            for p, ms in r.pat_results.items()
+        ]
+        for r in results
+    ] == expected
+
+
+def test_search_prefetch():
+    config_data = ConfigData(predefined_configuration="BasicSearch")
+    searcher = Search(config_data, get_doc_store(), prefetch=2)
+    results = list(searcher.search_documents())
+    assert [r.doc.name for r in results] == [get_doc().name]
+
+
 def test_to_from_dict():
     config_data = ConfigData(predefined_configuration="BasicSearch")
     doc_store = get_doc_store()
@@ -0,0 +1,29 @@
+import re
+
+from leat.search.pattern.literal_prefilter import fold_text, required_literals
+
+
+def test_required_literals():
+    assert required_literals(re.compile(r"\b(?:precision|recall)\b")) == {
+        "precision",
+        "recall",
+    }
+    assert required_literals(re.compile(r"\bdo\ (?:good|no\ harm)\b")) == {
+        "do good",
+        "do no harm",
+    }
+    assert required_literals(re.compile(r"\bF1\b")) == {"f1"}
+    assert required_literals(re.compile(r"\bbias\w*\b", re.IGNORECASE)) == {"bias"}
+    assert required_literals(re.compile(r"abc?d")) == {"abd", "abcd"}
+    # No literal of at least two characters is required
+    assert required_literals(re.compile(r"\b\d\d\d\d\b")) is None
+    assert required_literals(re.compile(r"\b[abc]\b")) is None
+    assert required_literals(re.compile(r"ab|c")) is None
+
+
+def test_fold_text():
+    text = "PRECISION, Dıd İt"
+    pattern = re.compile(r"precision|did|it", re.IGNORECASE)
+    literals = required_literals(pattern)
+    for m in pattern.finditer(text):
+        assert any(literal in fold_text(m.group(0)) for literal in literals)
@@ -1,4 +1,19 @@
-from leat.search.pattern.pattern_builder import create_terms_pattern
+import os
+import re
+
+import pytest
+
+from leat.search.config import ConfigData
+from leat.search.pattern import MatchPattern, PatternBuilder
+from leat.search.pattern.pattern_builder import (
+    ascii_regex,
+    build_combined_pattern,
+    compile_engine_regexes,
+    create_terms_pattern,
+    load_cached_patterns,
+    pattern_cache_file,
+    Trie,
+)
 
 
 def test_create_terms_pattern():
@@ -14,3 +29,87 @@ def test_create_terms_pattern_trie():
     )
     assert create_terms_pattern(["andy", "and/or"]) == "\\band(?:/or|y)\\b"
     assert create_terms_pattern(["and/or", "and"]) == "\\band(?:/or)?\\b"
+
+
+def test_create_terms_pattern_super_trie():
+    super_trie = Trie(allow_wildcards=True)
+    assert create_terms_pattern(["andy", "and/or"], super_trie=super_trie) == (
+        "\\band(?:/or|y)\\b"
+    )
+    assert create_terms_pattern(["an", "as"], super_trie=super_trie) == ("\\ba[ns]\\b")
+    assert super_trie.pattern() == "a(?:n(?:d(?:/or|y))?|s)"
+
+
+def test_build_combined_pattern():
+    pat1 = MatchPattern("A", r"\bprecision\b", flags=re.IGNORECASE)
+    pat2 = MatchPattern("B", r"\bRECALL\b")
+    pat3 = MatchPattern("C", r"(\w)\1")
+    combined, patterns, separate = build_combined_pattern([pat1, pat2, pat3])
+    assert patterns == [pat1, pat2]
+    assert separate == [pat3]
+    text = "Precision and RECALL, not recall"
+    assert [
+        (patterns[m.lastindex - 1].concept, m.group(0)) for m in combined.finditer(text)
+    ] == [("A", "Precision"), ("B", "RECALL")]
+
+
+def test_compile_engine_regexes():
+    pytest.importorskip("re2")
+    pat1 = MatchPattern("A", r"\bprecision\b", flags=re.IGNORECASE)
+    pat2 = MatchPattern("B", r"(\w)\1")
+    regexes = compile_engine_regexes([pat1, pat2], "re2")
+    # re2 does not support backreferences, so pat2 is searched with re
+    assert list(regexes) == [pat1]
+    text = "Precision and precision"
+    assert [m.span() for m in regexes[pat1].finditer(text)] == [
+        m.span() for m in pat1.finditer(text)
+    ]
+    assert compile_engine_regexes([pat1, pat2]) == {}
+
+
+def test_ascii_regex():
+    regex = re.compile(r"\bk\w*\s", re.IGNORECASE)
+    assert ascii_regex(regex).flags & re.ASCII
+    text = "Kind of okay, kids\t"
+    assert [m.span() for m in ascii_regex(regex).finditer(text)] == [
+        m.span() for m in regex.finditer(text)
+    ]
+    # Non-ASCII patterns are not changed
+    assert ascii_regex(re.compile("caf\u00e9")) == re.compile("caf\u00e9")
+
+
+def test_pattern_builder_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEAT_PATTERN_CACHE_DIR", str(tmp_path))
+    config_data = ConfigData(predefined_configuration="BasicSearch")
+    match_patterns, super_pattern = PatternBuilder.build(
+        config_data, super_pattern=True
+    )
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    cached_patterns, cached_super_pattern = PatternBuilder.build(
+        config_data, super_pattern=True
+    )
+    assert cached_super_pattern == super_pattern
+    assert [(p.concept, p.regex) for p in cached_patterns] == [
+        (p.concept, p.regex) for p in match_patterns
+    ]
+    # The cache is keyed by the arguments
+    PatternBuilder.build(config_data)
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires file ownership")
+def test_pattern_builder_cache_untrusted(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("LEAT_PATTERN_CACHE_DIR", str(tmp_path))
+    config_data = ConfigData(predefined_configuration="BasicSearch")
+    PatternBuilder.build(config_data)
+    cache_file = pattern_cache_file(config_data)
+    assert load_cached_patterns(cache_file) is not None
+    # Not loaded if writable by others
+    cache_file.chmod(0o666)
+    assert load_cached_patterns(cache_file) is None
+    assert "Not loading cached match patterns" in capsys.readouterr().out
+    cache_file.chmod(0o600)
+    tmp_path.chmod(0o777)
+    assert load_cached_patterns(cache_file) is None
+    tmp_path.chmod(0o700)
+    assert load_cached_patterns(cache_file) is not None
@@ -1,11 +1,14 @@
 from collections import Counter
+from io import StringIO
+import json
 import re
 
 import pytest
 
 from leat.store.core import Document
-from leat.search.result import DocResult
-from leat.search.result.result import summarize_match_result_terms
+from leat.search.pattern import MatchPattern
+from leat.search.result import DocResult, MatchResult
+from leat.search.result.result import summarize_match_result_terms, sweep_windows
 
 
 def test_bin_sliding_window_span_empty():
@@ -143,6 +146,18 @@ def test_sweep_spans(text, expected):
     assert DocResult.line_sweep_spans(gen_matches(text, MATCH_PATTERN)) == expected
 
 
+def test_sweep_spans_duplicates():
+    # equal matches are tracked separately while they continue
+    a = MR("(", "(ab)", 0, 4)
+    b = MR("(", "(ab)", 0, 4)
+    c = MR("[", "b", 2, 3)
+    sweepd = DocResult.line_sweep_spans([a, b, c])
+    assert [id(mr) for mr in sweepd[3]["c"]] == [id(a), id(b)]
+    assert sweepd[3]["e"] == [c]
+    assert [id(mr) for mr in sweepd[4]["e"]] == [id(a), id(b)]
+    assert "c" not in sweepd[4]
+
+
 ## Test summarize_match_result_terms
 
 DOC_TEXT_SMRT = "This is a test of precision and recall"
@@ -172,6 +187,26 @@ def test_summarize_match_result_terms_args():
     assert isinstance(list(r.values())[0], Counter)
 
 
+def test_summarize_match_result_terms_sort_by_count():
+    results = {MATCH_PATTERN_SMRT: MATCH_RESULTS_SMRT + MATCH_RESULTS_SMRT[1:]}
+    r = summarize_match_result_terms(results)
+    assert list(list(r.values())[0]) == ["recall", "precision"]
+    r = summarize_match_result_terms(results, sort_by_count=False)
+    assert list(r.values())[0] == {"precision": 1, "recall": 2}
+    assert list(list(r.values())[0]) == ["precision", "recall"]
+
+
+def test_summarize_match_result_terms_match_results():
+    doc = Document("test", DOC_TEXT_SMRT)
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    match_results = [MatchResult(doc, pat, m) for m in pat.finditer(DOC_TEXT_SMRT)]
+    r = summarize_match_result_terms(match_results)
+    assert r == {pat: {"precision": 1, "recall": 1}}
+    doc_result = DocResult(doc, {pat: match_results}, section_sep=125)
+    r = doc_result.sect_results[0].summarize_match_result_terms()
+    assert r == {pat: {"precision": 1, "recall": 1}}
+
+
 def test_to_from_dict_doc():
     document_text = "This is a test"
     doc1 = Document("test", document_text)
@@ -181,3 +216,171 @@ def test_to_from_dict_doc():
     print(doc_result1)
     print(dr1_test)
     assert dr1_test.doc.name == doc_result1.doc.name
+
+
+def test_to_from_dict_doc_shared_patterns():
+    text = "precision and recall"
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    doc_result = DocResult(Document("test", text), {pat: list(pat.finditer(text))})
+    patterns = {}
+    dr1 = DocResult.from_dict(doc_result.to_dict(), patterns=patterns)
+    dr2 = DocResult.from_dict(
+        doc_result.to_dict(compact_match_result=False), patterns=patterns
+    )
+    assert dr1.patterns[0] is dr2.patterns[0]
+    assert dr2.all_results()[0].pattern is dr1.patterns[0]
+    assert [mr.match_text for mr in dr1.all_results()] == ["precision", "recall"]
+    # Within one load, results share patterns, but separate loads do not
+    dr3 = DocResult.from_dict(doc_result.to_dict(compact_match_result=False))
+    assert all(mr.pattern is dr3.patterns[0] for mr in dr3.all_results())
+    assert dr3.patterns[0] is not dr1.patterns[0]
+
+
+def test_to_from_dict_doc_columnar():
+    text = "precision and recall"
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    doc_result = DocResult(Document("test", text), {pat: list(pat.finditer(text))})
+    d = doc_result.to_dict(columnar=True)
+    assert d["pat_results"][0][1] == {
+        "starts": [0, 14],
+        "ends": [9, 20],
+        "match_texts": ["precision", "recall"],
+    }
+    dr = DocResult.from_dict(d)
+    assert [(mr.start, mr.end, mr.match_text) for mr in dr.all_results()] == [
+        (0, 9, "precision"),
+        (14, 20, "recall"),
+    ]
+    assert dr.to_dict() == doc_result.to_dict()
+
+
+def test_to_json_stream_doc():
+    text = "precision and recall, then precision"
+    pat1 = MatchPattern("Performance Metrics", r"\bprecision\b")
+    pat2 = MatchPattern("Performance Metrics", r"\brecall\b")
+    doc_result = DocResult(
+        Document("test", text),
+        {pat1: list(pat1.finditer(text)), pat2: list(pat2.finditer(text))},
+    )
+    for kwargs in [{}, {"compact_match_result": False}, {"columnar": True}]:
+        stream = StringIO()
+        doc_result.to_json_stream(stream, **kwargs)
+        assert stream.getvalue() == json.dumps(doc_result.to_dict(**kwargs))
+
+
+def test_doc_result_arrays():
+    text = "precision and recall, then precision"
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    doc_result = DocResult(Document("test", text), {pat: list(pat.finditer(text))})
+    assert doc_result.starts.tolist() == [0, 14, 27]
+    assert doc_result.ends.tolist() == [9, 20, 36]
+    assert doc_result.pat_idx.tolist() == [0, 0, 0]
+    assert [mr.match_text for mr in doc_result.pat_results[pat]] == [
+        "precision",
+        "recall",
+        "precision",
+    ]
+    assert doc_result.all_results() == doc_result.pat_results[pat]
+    doc_result.section_results(section_sep=5)
+    assert [len(sr.results) for sr in doc_result.sect_results] == [2, 1]
+
+
+def test_doc_result_section_cache():
+    text = "precision and recall, then precision"
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    doc_result = DocResult(Document("test", text), {pat: list(pat.finditer(text))})
+    assert doc_result.sect_results is None
+    assert doc_result.astext(include_labels=False)
+    sections = doc_result.section_results(section_sep=5, resection=True)
+    assert len(sections) == 2
+    assert len(doc_result.section_results(resection=True)) == 1
+    assert doc_result.section_results(section_sep=5, resection=True) is sections
+
+
+def test_doc_result_lazy_match_results():
+    text = "precision and recall"
+    pat1 = MatchPattern("Performance Metrics", r"\bprecision\b")
+    pat2 = MatchPattern("Performance Metrics", r"\brecall\b")
+    doc_result = DocResult(
+        Document("test", text),
+        {pat1: list(pat1.finditer(text)), pat2: list(pat2.finditer(text))},
+    )
+    assert not any(isinstance(r, MatchResult) for r in doc_result.matches_raw)
+    assert [mr.match_text for mr in doc_result.all_results(pat=pat2)] == ["recall"]
+    assert [isinstance(r, MatchResult) for r in doc_result.matches_raw] == [
+        False,
+        True,
+    ]
+
+
+def test_doc_result_mixed_results():
+    text = "precision and recall"
+    doc = Document("test", text)
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    m1, m2 = pat.finditer(text)
+    for results in ([MatchResult(doc, pat, m1), m2], [m1, MatchResult(doc, pat, m2)]):
+        doc_result = DocResult(doc, {pat: results})
+        assert doc_result.starts.tolist() == [0, 14]
+        assert doc_result.ends.tolist() == [9, 20]
+
+
+def test_doc_result_contains():
+    text = "precision and recall"
+    pat1 = MatchPattern("Performance Metrics", r"\bprecision\b")
+    pat2 = MatchPattern("Other", r"\bnothing\b")
+    doc_result = DocResult(Document("test", text), {pat1: list(pat1.finditer(text))})
+    assert "Performance Metrics" in doc_result
+    assert "Other" not in doc_result
+    assert pat1 in doc_result
+    assert pat2 not in doc_result
+    assert len(doc_result.all_results(concept="Performance Metrics")) == 1
+    assert doc_result.all_results(concept="Other") == []
+
+
+def test_sweep_windows():
+    starts = [1, 1, 4, 10, 12]
+    ends = [3, 2, 7, 11, 30]
+    assert sweep_windows(starts, ends, maxsep=2) == [(0, 3), (3, 5)]
+    assert sweep_windows(starts, ends, maxsep=2, maxlength=5, name="x") == [
+        (0, 2),
+        (2, 3),
+        (3, 4),
+        (4, 5),
+    ]
+
+
+def test_sweep_windows_trivial(capsys):
+    assert sweep_windows([], []) == []
+    assert sweep_windows([4], [20], maxlength=30) == [(0, 1)]
+    assert capsys.readouterr().out == ""
+    assert sweep_windows([4], [20], maxlength=5) == [(0, 1)]
+    assert "span length 16 greater than 5" in capsys.readouterr().out
+
+
+def test_sweep_windows_messages(capsys):
+    sweep_windows([1, 4], [3, 20], maxsep=2, maxlength=5)
+    assert "For None, splitting span length 19" in capsys.readouterr().out
+    sweep_windows([1, 4], [3, 20], maxsep=2, maxlength=5, items=["a", "b"])
+    assert "For b, splitting" in capsys.readouterr().out
+
+
+def test_sweep_windows_jit(monkeypatch):
+    pytest.importorskip("numba")
+    import leat.search.result.result as result_module
+
+    starts = list(range(0, 3000, 3))
+    ends = [s + (s % 7) for s in starts]
+    expected = sweep_windows(starts, ends, maxsep=2, maxlength=20, name="x")
+    monkeypatch.setattr(result_module, "SWEEP_JIT_MIN_SPANS", 0)
+    assert sweep_windows(starts, ends, maxsep=2, maxlength=20, name="x") == expected
+
+
+def test_doc_result_super_pattern():
+    text = "This is a test of precision and recall"
+    pat = MatchPattern("Performance Metrics", r"\bprecision\b|\brecall\b")
+    doc = Document("test", text)
+    doc_result = DocResult(doc, {pat: pat.finditer(text)}, super_pattern=r"\btest\b")
+    assert len(doc_result.all_results()) == 2
+    doc_result = DocResult(doc, {pat: pat.finditer(text)}, super_pattern=r"\bbias\b")
+    assert doc_result.all_results() == []
+    assert doc_result.pat_results == {}
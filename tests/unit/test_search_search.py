@@ -1,6 +1,12 @@
+import json
+import re
+
 import pytest
 
 from leat.search import Search
+from leat.search.config import ConfigData
+from leat.search.pattern import pattern_builder
+from leat.search.search import _prefetch
 
 DOC_TEXT_1 = "This is a test of precision and recall"
 
@@ -20,3 +26,203 @@ def test_search():
     assert mr2.start == 32
     assert mr2.end == 38
     assert mr2.match_text == "recall"
+
+
+def test_search_combined_scan():
+    search = Search(predefined_configuration="BasicSearch", combined_scan=True)
+    r = search.search_document_text(DOC_TEXT_1)
+    assert [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] == [
+        ("Performance Metrics", "precision"),
+        ("Performance Metrics", "recall"),
+    ]
+
+
+def test_search_use_hyperscan():
+    search = Search(predefined_configuration="BasicSearch", use_hyperscan=True)
+    r = search.search_document_text(DOC_TEXT_1)
+    assert [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] == [
+        ("Performance Metrics", "precision"),
+        ("Performance Metrics", "recall"),
+    ]
+    assert search.search_document_text("This is a test") is None
+
+
+def test_search_super_pattern():
+    search = Search(predefined_configuration="BasicSearch")
+    # Documents without matches are rejected by one scan of the super pattern
+    assert search._super_pattern.search("This is a test") is None
+    assert search._super_pattern.search(DOC_TEXT_1) is not None
+    assert search.search_document_text("This is a test") is None
+
+
+def test_search_cache_size():
+    search = Search(predefined_configuration="BasicSearch", cache_size=1)
+    r = search.search_document_text(DOC_TEXT_1)
+    assert search.search_document_text(DOC_TEXT_1) is r
+    assert search.search_document_text(DOC_TEXT_1, name="Other") is not r
+    # Least recently used result is dropped
+    assert search.search_document_text(DOC_TEXT_1) is not r
+    search.config = search.config
+    assert not search._doc_cache
+
+
+@pytest.mark.parametrize("engine", ["re2", "regex"])
+def test_search_engine(engine):
+    pytest.importorskip(engine)
+    search = Search(predefined_configuration="BasicSearch", engine=engine)
+    # Patterns are searched with the engine, not re
+    assert all(
+        type(finditer.__self__).__module__.startswith(engine)
+        for *_, finditer in search._finditers
+        if finditer is not None
+    )
+    r = search.search_document_text(DOC_TEXT_1)
+    assert [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] == [
+        ("Performance Metrics", "precision"),
+        ("Performance Metrics", "recall"),
+    ]
+
+
+@pytest.mark.parametrize("engine", ["re2", "regex", "unknown"])
+def test_search_engine_fallback(engine, monkeypatch, capsys):
+    monkeypatch.setattr(pattern_builder, "RE2_AVAILABLE", False)
+    monkeypatch.setattr(pattern_builder, "REGEX_AVAILABLE", False)
+    search = Search(predefined_configuration="BasicSearch", engine=engine)
+    assert "using re: " + engine in capsys.readouterr().out
+    assert all(
+        isinstance(finditer.__self__, re.Pattern)
+        for *_, finditer in search._finditers
+        if finditer is not None
+    )
+    r = search.search_document_text(DOC_TEXT_1)
+    assert [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] == [
+        ("Performance Metrics", "precision"),
+        ("Performance Metrics", "recall"),
+    ]
+
+
+def test_search_non_ascii():
+    search = Search(predefined_configuration="BasicSearch")
+    r = search.search_document_text("Caf\u00e9 precision, \u00e9recall")
+    # Word boundaries are Unicode aware, so the second is not a match
+    assert [mr.match_text for mr in r.all_results()] == ["precision"]
+
+
+def test_search_use_ahocorasick():
+    search = Search(predefined_configuration="BasicSearch", use_ahocorasick=True)
+    r = search.search_document_text(DOC_TEXT_1)
+    assert [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] == [
+        ("Performance Metrics", "precision"),
+        ("Performance Metrics", "recall"),
+    ]
+    assert search.search_document_text("This is a test") is None
+
+
+def test_prefetch():
+    assert list(_prefetch(range(10), 2)) == list(range(10))
+
+    def items():
+        yield 1
+        raise ValueError("unreadable")
+
+    with pytest.raises(ValueError):
+        list(_prefetch(items()))
+    docs = _prefetch(range(100), 2)
+    assert next(docs) == 0
+    docs.close()
+
+
+def test_search_duplicate_patterns():
+    config = ConfigData()
+    config.data = {
+        "Search": {
+            "_sheet_type": "SEARCH",
+            "A": ["recall"],
+            "B": ["bias"],
+            "C": ["recall"],
+        }
+    }
+    search = Search(config)
+    r = search.search_document_text("recall, bias, recall")
+    assert [(p.concept, [m.start for m in ms]) for p, ms in r.pat_results.items()] == [
+        ("A", [0, 14]),
+        ("B", [8]),
+        ("C", [0, 14]),
+    ]
+
+
+def test_search_split_doc_size(tmp_path):
+    config = ConfigData()
+    config.data = {
+        "Search": {
+            "_sheet_type": "SEARCH",
+            "A": ["recall"],
+            "B": ["bias"],
+            "C": ["recall"],
+            "D": ["test"],
+        }
+    }
+    (tmp_path / "doc.txt").write_text("recall, bias, recall")
+    (tmp_path / "none.txt").write_text("no matches")
+    search = Search(config, str(tmp_path), n_workers=2, split_doc_size=10)
+    results = list(search.search_documents())
+    assert len(results) == 1
+    r = results[0]
+    assert [(p.concept, [m.start for m in ms]) for p, ms in r.pat_results.items()] == [
+        ("A", [0, 14]),
+        ("B", [8]),
+        ("C", [0, 14]),
+    ]
+    # C has the same regex as A, but is searched in the other worker's group
+    assert [
+        (p.concept, [m.pattern.concept for m in ms]) for p, ms in r.pat_results.items()
+    ] == [
+        ("A", ["A", "A"]),
+        ("B", ["B"]),
+        ("C", ["C", "C"]),
+    ]
+    expected = Search(config).search_document_text("recall, bias, recall")
+    assert [(m.pattern.concept, m.start) for m in r.all_results()] == [
+        (m.pattern.concept, m.start) for m in expected.all_results()
+    ]
+    # All patterns in the combined scan, so none are searched in the workers
+    search = Search(
+        config, str(tmp_path), n_workers=2, split_doc_size=10, combined_scan=True
+    )
+    results = list(search.search_documents())
+    assert len(results) == 1
+    assert [(m.pattern.concept, m.start, m.end) for m in results[0].all_results()] == [
+        (m.pattern.concept, m.start, m.end) for m in expected.all_results()
+    ]
+
+
+def test_search_use_hyperscan_same_matches(tmp_path):
+    pytest.importorskip("hyperscan")
+    # Patterns whose re syntax hyperscan reads differently, or with characters that
+    # hyperscan classes or case folding do not match
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "Patterns": {
+                    "_sheet_type": "PATTERN",
+                    "Bounded": {"0": ["ab{,3}c", r"\d{,2}x"]},
+                    "Space": {"0": [r"a\sb"]},
+                    "Case": {"2": ["kiss"]},
+                }
+            }
+        )
+    )
+    config = ConfigData(config_file)
+    texts = ["abbc", "a x", "a\x1cb", "\u212aiss", "no matches"]
+    expected = [
+        [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] if r else None
+        for r in (Search(config).search_document_text(t) for t in texts)
+    ]
+    search = Search(config, use_hyperscan=True)
+    assert search._hyperscan_db is not None
+    assert [
+        [(mr.pattern.concept, mr.match_text) for mr in r.all_results()] if r else None
+        for r in (search.search_document_text(t) for t in texts)
+    ] == expected
+    assert expected[-1] is None and all(expected[:-1])